@@ -7,13 +7,14 @@ BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 if BASE_DIR not in sys.path:
     sys.path.insert(0, BASE_DIR)
 
-from PySide6.QtWidgets import QApplication
-
 from database import Database
 from settings import SettingsManager
-from ui_main_window import MainWindow
 
 def main() -> None:
+    # Qt y la ventana principal se importan aquí: "import app" no paga PySide6
+    from PySide6.QtWidgets import QApplication
+    from ui_main_window import MainWindow
+
     app = QApplication(sys.argv)
 
     db = Database()
@@ -29,6 +30,10 @@ def main() -> None:
 
     settings.save()
     db.close()
+    # Lo que el escritor no pudo guardar al cerrar ya no se ve en la ventana
+    error = db.take_writer_error()
+    if error is not None:
+        print(f"No se guardó en la BD: {error}", file=sys.stderr)
 
     sys.exit(exit_code)
 
@@ -1,16 +1,53 @@
 # data_acquisition.py
 from __future__ import annotations
 from pathlib import Path
-from typing import Optional, Literal
+from typing import TYPE_CHECKING, List, Optional, Literal
 from datetime import datetime
 
-import pandas as pd
-
 from models import SensorReading
 
+if TYPE_CHECKING:
+    from database import Database
+
 
 SourceType = Literal["csv", "json"]
 
+_FLOAT_COLUMNS = ("temperature", "humidity", "luminosity")
+
+# CSV más grandes que esto se leen por bloques (con pyarrow) en vez de enteros
+STREAM_THRESHOLD_BYTES = 64 * 1024 * 1024
+
+
+def _parse_timestamp(value: object) -> Optional[datetime]:
+    if value is None:
+        return None
+    try:
+        return datetime.fromisoformat(str(value))
+    except ValueError:
+        return None
+
+
+def _arrow_convert_options():
+    import pyarrow as pa
+    import pyarrow.csv as pacsv
+
+    # timestamp como texto: si pyarrow infiriese el tipo con el primer
+    # bloque, una fecha mal formada más adelante haría fallar toda la carga
+    column_types = {name: pa.float64() for name in _FLOAT_COLUMNS}
+    column_types["timestamp"] = pa.string()
+    return pacsv.ConvertOptions(column_types=column_types)
+
+
+def _arrow_timestamps(col) -> List[Optional[datetime]]:
+    """Columna de texto -> datetimes; None donde no se pueda interpretar."""
+    import pyarrow as pa
+
+    try:
+        # Camino rápido: conversión vectorizada si todas son ISO sin zona
+        return col.cast(pa.timestamp("us")).to_pylist()
+    except (pa.ArrowInvalid, pa.ArrowNotImplementedError):
+        return [_parse_timestamp(v) for v in col.to_pylist()]
+
 
 class FileDataSource:
     """
@@ -18,41 +55,145 @@ class FileDataSource:
     timestamp, temperature, humidity, luminosity
 
     Si no hay timestamp, se genera automáticamente en tiempo real.
+
+    Los CSV de más de STREAM_THRESHOLD_BYTES se leen bloque a bloque, así
+    que en memoria solo está el bloque actual (y `index` es relativo a él).
     """
 
     def __init__(self, file_path: Path, source_type: SourceType = "csv") -> None:
         self.file_path = file_path
         self.source_type = source_type
+        # Lector por bloques de pyarrow (solo CSV grandes)
+        self._reader = None
         if source_type == "csv":
-            self.df = pd.read_csv(file_path)
+            try:
+                if file_path.stat().st_size > STREAM_THRESHOLD_BYTES:
+                    self._open_csv_stream(file_path)
+                else:
+                    self._load_csv_arrow(file_path)
+            except ImportError:
+                self._load_pandas(file_path)
         else:
-            self.df = pd.read_json(file_path)
+            self._load_pandas(file_path)
 
+        # Nº de filas, fijo tras la carga: next_reading() solo compara índices
+        self._count = len(self._temp)
         self.index = 0
 
-    def next_reading(self) -> Optional[SensorReading]:
-        if self.index >= len(self.df):
-            return None
+    # Las columnas se convierten una sola vez a listas tipadas para que
+    # next_reading() no toque pandas/pyarrow en cada tick.
 
-        row = self.df.iloc[self.index]
-        self.index += 1
+    def _load_csv_arrow(self, file_path: Path) -> None:
+        """CSV con el lector multihilo de pyarrow (si está instalado)."""
+        import pyarrow.csv as pacsv
+
+        self._set_arrow_columns(
+            pacsv.read_csv(file_path, convert_options=_arrow_convert_options())
+        )
 
-        # Timestamp
-        if "timestamp" in row and not pd.isna(row["timestamp"]):
+    def _open_csv_stream(self, file_path: Path) -> None:
+        import pyarrow.csv as pacsv
+
+        self._reader = pacsv.open_csv(
+            file_path, convert_options=_arrow_convert_options()
+        )
+        self._ts, self._temp, self._hum, self._lux = [], [], [], []
+        self._next_batch()
+
+    def _next_batch(self) -> bool:
+        """Carga el siguiente bloque del CSV; False si no quedan más."""
+        while self._reader is not None:
             try:
-                ts = datetime.fromisoformat(str(row["timestamp"]))
-            except Exception:
-                ts = datetime.now()
+                batch = self._reader.read_next_batch()
+            except StopIteration:
+                self._reader.close()
+                self._reader = None
+                return False
+            if batch.num_rows:
+                self._set_arrow_columns(batch)
+                self._count = batch.num_rows
+                self.index = 0
+                return True
+        return False
+
+    def _set_arrow_columns(self, data) -> None:
+        """Columnas desde una tabla o un RecordBatch de pyarrow."""
+        n = data.num_rows
+        names = data.schema.names
+
+        if "timestamp" in names:
+            self._ts: List[Optional[datetime]] = _arrow_timestamps(
+                data.column("timestamp")
+            )
+        else:
+            self._ts = [None] * n
+
+        self._temp, self._hum, self._lux = (
+            data.column(name).to_numpy(zero_copy_only=False).tolist()
+            if name in names
+            else [0.0] * n
+            for name in _FLOAT_COLUMNS
+        )
+
+    def _load_pandas(self, file_path: Path) -> None:
+        # pandas se importa aquí para no pagar su carga al arrancar la app
+        import pandas as pd
+
+        if self.source_type == "csv":
+            df = pd.read_csv(file_path)
+        else:
+            df = pd.read_json(file_path)
+        n = len(df)
+
+        # Timestamp: None donde falte o no se pueda interpretar (fila a fila,
+        # igual que con pyarrow: to_datetime fija un formato con la primera)
+        if "timestamp" in df.columns:
+            self._ts = [
+                None if pd.isna(v) else _parse_timestamp(v) for v in df["timestamp"]
+            ]
         else:
-            ts = datetime.now()
+            self._ts = [None] * n
 
-        temp = float(row.get("temperature", 0.0))
-        hum = float(row.get("humidity", 0.0))
-        lux = float(row.get("luminosity", 0.0))
+        self._temp, self._hum, self._lux = (
+            df[name].to_numpy(dtype="float64").tolist()
+            if name in df.columns
+            else [0.0] * n
+            for name in _FLOAT_COLUMNS
+        )
+
+    def next_reading(self) -> Optional[SensorReading]:
+        i = self.index
+        if i >= self._count:
+            if not self._next_batch():
+                return None
+            i = 0
+        self.index = i + 1
 
         return SensorReading(
-            timestamp=ts,
-            temperature=temp,
-            humidity=hum,
-            luminosity=lux,
+            timestamp=self._ts[i] or datetime.now(),
+            temperature=self._temp[i],
+            humidity=self._hum[i],
+            luminosity=self._lux[i],
         )
+
+    def bulk_insert(self, db: Database) -> int:
+        """
+        Vuelca en la BD todas las lecturas pendientes de una sola vez
+        (executemany en una transacción) y deja la fuente agotada.
+        Devuelve el número de filas insertadas.
+        """
+        total = 0
+        now = datetime.now()
+        while True:
+            start = self.index
+            end = self._count
+            db.insert_columns(
+                (ts or now for ts in self._ts[start:end]),
+                self._temp[start:end],
+                self._hum[start:end],
+                self._lux[start:end],
+            )
+            self.index = end
+            total += end - start
+            if not self._next_batch():
+                return total
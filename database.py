@@ -1,107 +1,466 @@
 # database.py
+import math
+import queue
 import sqlite3
+import threading
+from collections import deque
+from contextlib import contextmanager
 from pathlib import Path
-from typing import List, Optional
+from itertools import islice
+from typing import TYPE_CHECKING, Deque, Dict, Iterable, Iterator, List, Optional
 from datetime import datetime
 
 from models import SensorReading
 
+if TYPE_CHECKING:
+    import numpy as np
+
 DB_FILE = Path("sensors.db")
 
+# Las inserciones se encolan y un hilo escritor las vuelca a SQLite en lotes
+# de hasta WRITER_BATCH_MAX inserciones, cada lote en una sola transacción.
+WRITER_QUEUE_MAX = 10_000
+WRITER_BATCH_MAX = 500
+
+# Conexiones de solo lectura para la UI; con WAL leen en paralelo al escritor
+READER_POOL_SIZE = 4
+
+# Últimas lecturas insertadas en esta sesión, para servir get_last_n_readings
+# sin ir a SQLite
+RECENT_READINGS_MAX = 10_000
+
+# sensor_data.timestamp se guarda como INTEGER: microsegundos desde
+# 1970-01-01 UTC (tiempo Unix). Las fechas sin zona se toman como hora local,
+# así que fechas con y sin zona quedan en el mismo eje y ordenadas.
+
+_SENSOR_DATA_DDL = """
+    CREATE TABLE sensor_data (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        timestamp INTEGER NOT NULL,   -- microsegundos (ver _to_us)
+        temperature REAL NOT NULL,
+        humidity REAL NOT NULL,
+        luminosity REAL NOT NULL
+    );
+"""
+_ALERTS_DDL = """
+    CREATE TABLE alerts (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        timestamp TEXT NOT NULL,
+        level TEXT NOT NULL,       -- 'normal', 'warning', 'critical'
+        message TEXT NOT NULL,
+        temperature REAL,
+        humidity REAL,
+        luminosity REAL
+    );
+"""
+
+_INSERT_READING_SQL = """
+    INSERT INTO sensor_data (timestamp, temperature, humidity, luminosity)
+    VALUES (?, ?, ?, ?)
+"""
+
+_INSERT_ALERT_SQL = """
+    INSERT INTO alerts (timestamp, level, message, temperature, humidity, luminosity)
+    VALUES (?, ?, ?, ?, ?, ?)
+"""
+
+# La subconsulta toma las n últimas y la externa las devuelve ya en orden
+# cronológico, así el resultado se construye en una sola pasada.
+_LAST_N_READINGS_SQL = """
+    SELECT timestamp, temperature, humidity, luminosity
+    FROM (
+        SELECT id, timestamp, temperature, humidity, luminosity
+        FROM sensor_data
+        ORDER BY id DESC
+        LIMIT ?
+    )
+    ORDER BY id ASC
+"""
+
+# dtype de get_last_n_columns: ts en microsegundos Unix, UTC (ver _to_us)
+READING_COLUMNS_DTYPE = [("ts", "i8"), ("t", "f8"), ("h", "f8"), ("l", "f8")]
+
+
+def _to_us(ts: datetime) -> int:
+    """datetime -> microsegundos Unix. Sin zona = hora local."""
+    # timestamp() interpreta una fecha sin zona como hora local; los
+    # microsegundos se suman aparte para no perderlos en el float (floor y no
+    # int para que antes de 1970 no se redondee hacia cero)
+    return math.floor(ts.timestamp()) * 1_000_000 + ts.microsecond
+
+
+def _from_us(us: int) -> datetime:
+    """Microsegundos Unix -> datetime en hora local, sin zona (como now())."""
+    return datetime.fromtimestamp(us / 1_000_000)
+
+
+class WriteError(Exception):
+    """Escritura descartada; error original en __cause__ y fila en .row."""
+
+    def __init__(self, error: Exception, row: Optional[tuple] = None) -> None:
+        detail = "" if row is None else f" (fila descartada: {row!r})"
+        super().__init__(f"{type(error).__name__}: {error}{detail}")
+        self.row = row
+        self.__cause__ = error
+
+
+def _execute_batch(
+    conn: sqlite3.Connection, cur: sqlite3.Cursor, rows: Dict[str, List[tuple]]
+) -> Optional[WriteError]:
+    """
+    Ejecuta el lote en una transacción. Si falla, lo repite fila a fila para
+    perder solo las filas inválidas (p. ej. un NaN, que SQLite guarda como
+    NULL y choca con NOT NULL, o un entero que no cabe en 64 bits). Devuelve
+    el primer error, con la fila que lo provocó, o None.
+    """
+    try:
+        for sql, params in rows.items():
+            cur.executemany(sql, params)
+        conn.commit()
+        return None
+    except Exception:
+        conn.rollback()
+
+    first: Optional[WriteError] = None
+    for sql, params in rows.items():
+        for row in params:
+            try:
+                cur.execute(sql, row)
+            except Exception as e:
+                if first is None:
+                    first = WriteError(e, row)
+    conn.commit()
+    return first
+
 
 class Database:
     def __init__(self, db_path: Path = DB_FILE) -> None:
         self.db_path = db_path
         self.conn: Optional[sqlite3.Connection] = None
+        self._insert_cur: Optional[sqlite3.Cursor] = None
+        # Cola de (sql, fila) para el hilo escritor; None lo detiene
+        self._write_q: "queue.Queue[Optional[tuple]]" = queue.Queue(
+            maxsize=WRITER_QUEUE_MAX
+        )
+        self._writer: Optional[threading.Thread] = None
+        # Primer error de escritura pendiente de recoger (take_writer_error)
+        self._writer_error: Optional[WriteError] = None
+        self._error_lock = threading.Lock()
+        self._readers: "queue.Queue[sqlite3.Connection]" = queue.Queue()
+        self._recent: Deque[SensorReading] = deque(maxlen=RECENT_READINGS_MAX)
+        # Lo marca el escritor al descartar filas: el caché ya no coincide
+        # con la tabla y se vacía en la siguiente lectura (hilo de la UI)
+        self._recent_stale = False
+
+    def _is_memory(self) -> bool:
+        return str(self.db_path) == ":memory:"
 
     def connect(self) -> None:
         first_time = not self.db_path.exists()
         self.conn = sqlite3.connect(self.db_path)
+        # El esquema va antes que los PRAGMA: page_size no se puede cambiar
+        # una vez la BD tiene datos o está en modo WAL.
         if first_time:
             self._create_tables()
+        else:
+            self._migrate_text_timestamps()
+        self._apply_pragmas(self.conn)
+        self._create_indexes()
+        self._open_readers()
+        # Cursor reutilizado por las inserciones hechas desde este hilo
+        self._insert_cur = self.conn.cursor()
+        self._start_writer()
+
+    def _apply_pragmas(self, conn: sqlite3.Connection) -> None:
+        # WAL: escrituras secuenciales y lecturas concurrentes con el escritor.
+        # En una BD en memoria no tiene sentido (no hay fichero de journal).
+        if not self._is_memory():
+            conn.execute("PRAGMA journal_mode=WAL")
+        # Con WAL, NORMAL sigue siendo seguro ante caídas de la aplicación
+        # y evita un fsync por cada COMMIT.
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("PRAGMA temp_store=MEMORY")
+        conn.execute("PRAGMA cache_size=-20000")    # ~20 MB
+        conn.execute("PRAGMA mmap_size=268435456")  # 256 MB
 
     def _create_tables(self) -> None:
         assert self.conn is not None
-        cur = self.conn.cursor()
-
-        # Tabla de datos de sensores
-        cur.execute(
-            """
-            CREATE TABLE sensor_data (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                timestamp TEXT NOT NULL,
-                temperature REAL NOT NULL,
-                humidity REAL NOT NULL,
-                luminosity REAL NOT NULL
-            );
-            """
+        # Páginas de 8 KB: árbol B más bajo para tablas de log que solo crecen
+        self.conn.executescript(
+            "PRAGMA page_size=8192;" + _SENSOR_DATA_DDL + _ALERTS_DDL
         )
 
-        # Tabla de alertas
-        cur.execute(
-            """
-            CREATE TABLE alerts (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                timestamp TEXT NOT NULL,
-                level TEXT NOT NULL,       -- 'normal', 'warning', 'critical'
-                message TEXT NOT NULL,
-                temperature REAL,
-                humidity REAL,
-                luminosity REAL
-            );
-            """
-        )
+    def _migrate_text_timestamps(self) -> None:
+        """
+        Migración única: las BDs antiguas guardaban sensor_data.timestamp
+        como texto ISO. SQLite no permite cambiar el tipo de una columna,
+        así que se reconstruye la tabla conservando los ids.
+        """
+        assert self.conn is not None
+        columns = {
+            name: col_type.upper()
+            for _, name, col_type, *_ in self.conn.execute(
+                "PRAGMA table_info(sensor_data)"
+            )
+        }
+        if columns.get("timestamp") != "TEXT":
+            return
 
+        rows = self.conn.execute(
+            "SELECT id, timestamp, temperature, humidity, luminosity FROM sensor_data"
+        ).fetchall()
+        try:
+            self.conn.execute("BEGIN")
+            self.conn.execute("ALTER TABLE sensor_data RENAME TO sensor_data_old")
+            self.conn.execute(_SENSOR_DATA_DDL)
+            self.conn.executemany(
+                """
+                INSERT INTO sensor_data (id, timestamp, temperature, humidity, luminosity)
+                VALUES (?, ?, ?, ?, ?)
+                """,
+                (
+                    (row_id, _to_us(datetime.fromisoformat(ts)), t, h, l)
+                    for row_id, ts, t, h, l in rows
+                ),
+            )
+            self.conn.execute("DROP TABLE sensor_data_old")
+            self.conn.commit()
+        except Exception:
+            self.conn.rollback()
+            raise
+
+    def _create_indexes(self) -> None:
+        # IF NOT EXISTS: también migra BDs creadas antes de existir los índices
+        assert self.conn is not None
+        self.conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_sensor_ts ON sensor_data(timestamp)"
+        )
+        self.conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_alerts_ts ON alerts(timestamp)"
+        )
         self.conn.commit()
 
+    def _open_readers(self) -> None:
+        # Una BD en memoria es privada de su conexión: se lee con self.conn
+        if self._is_memory():
+            return
+        for _ in range(READER_POOL_SIZE):
+            reader = sqlite3.connect(self.db_path, check_same_thread=False)
+            reader.execute("PRAGMA query_only=1")
+            self._readers.put(reader)
+
+    @contextmanager
+    def read(self) -> Iterator[sqlite3.Connection]:
+        """Presta una conexión de lectura del pool (o self.conn si no hay)."""
+        assert self.conn is not None
+        if self._is_memory():
+            yield self.conn
+            return
+        reader = self._readers.get()
+        try:
+            yield reader
+        finally:
+            self._readers.put(reader)
+
     def close(self) -> None:
         if self.conn:
+            # El sentinel va detrás de lo encolado: join() espera a que se
+            # guarde todo. Los errores quedan para take_writer_error().
+            if self._writer is not None:
+                self._write_q.put(None)
+                self._writer.join()
+                self._writer = None
+            while not self._readers.empty():
+                self._readers.get_nowait().close()
             self.conn.close()
             self.conn = None
+            self._insert_cur = None
+
+    # ==================== HILO ESCRITOR ====================
+
+    def _start_writer(self) -> None:
+        # Una BD en memoria no se puede abrir desde otra conexión: en ese
+        # caso se escribe directamente (sin fichero no hay fsync que evitar).
+        if self._is_memory():
+            return
+        writer_conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        self._apply_pragmas(writer_conn)
+        self._writer = threading.Thread(
+            target=self._writer_loop,
+            args=(writer_conn,),
+            name="sqlite-writer",
+            daemon=True,
+        )
+        self._writer.start()
+
+    def _writer_loop(self, conn: sqlite3.Connection) -> None:
+        cur = conn.cursor()
+        stop = False
+        while not stop:
+            batch = [self._write_q.get()]
+            while len(batch) < WRITER_BATCH_MAX:
+                try:
+                    batch.append(self._write_q.get_nowait())
+                except queue.Empty:
+                    break
+
+            # Agrupar por sentencia: un executemany por tabla
+            rows: Dict[str, List[tuple]] = {}
+            for item in batch:
+                if item is None:
+                    stop = True
+                else:
+                    rows.setdefault(item[0], []).extend(item[1])
+            error: Optional[WriteError] = None
+            try:
+                error = _execute_batch(conn, cur, rows)
+            except Exception as e:
+                # Fallo del propio COMMIT (disco lleno, BD bloqueada...): el
+                # hilo sigue vivo, si no la cola se llenaría y put() no volvería
+                conn.rollback()
+                error = WriteError(e)
+            finally:
+                # Antes de task_done(): tras flush() el error ya es visible
+                if error is not None:
+                    self._record_error(error)
+                for _ in batch:
+                    self._write_q.task_done()
+        conn.close()
+
+    def _write(self, sql: str, row: tuple) -> None:
+        self._write_many(sql, [row])
+
+    def _write_many(self, sql: str, rows: List[tuple]) -> None:
+        if self._writer is None:
+            assert self.conn is not None and self._insert_cur is not None
+            error = _execute_batch(self.conn, self._insert_cur, {sql: rows})
+            if error is not None:
+                self._record_error(error)
+        else:
+            # Solo bloquea si el escritor va WRITER_QUEUE_MAX lotes por detrás
+            self._write_q.put((sql, rows))
+
+    def _record_error(self, error: WriteError) -> None:
+        self._recent_stale = True
+        # Se conserva el primero hasta que alguien lo recoja
+        with self._error_lock:
+            if self._writer_error is None:
+                self._writer_error = error
+
+    def take_writer_error(self) -> Optional[WriteError]:
+        """
+        Devuelve (y olvida) el primer error de escritura desde la última
+        llamada, o None. Las escrituras no lanzan: la UI lo consulta.
+        """
+        if self._writer_error is None:
+            return None
+        with self._error_lock:
+            error, self._writer_error = self._writer_error, None
+        return error
+
+    def flush(self) -> None:
+        """Espera a que el hilo escritor haya guardado todo lo encolado."""
+        assert self.conn is not None
+        self._write_q.join()
 
     # ==================== LECTURAS DE SENSORES ====================
 
+    def _remember(self, rows: List[tuple]) -> None:
+        # Se guardan tal como las devolvería SQLite (hora local sin zona)
+        # para que caché y consulta no mezclen fechas con y sin zona
+        self._recent.extend(
+            SensorReading(_from_us(ts_us), temp, hum, lux)
+            for ts_us, temp, hum, lux in rows
+        )
+
     def insert_reading(self, reading: SensorReading) -> None:
+        self.insert_readings_many([reading])
+
+    def insert_readings_many(self, readings: List[SensorReading]) -> None:
+        """Varias lecturas en una sola transacción (un executemany)."""
         assert self.conn is not None
-        cur = self.conn.cursor()
-        cur.execute(
-            """
-            INSERT INTO sensor_data (timestamp, temperature, humidity, luminosity)
-            VALUES (?, ?, ?, ?)
-            """,
-            (
-                reading.timestamp.isoformat(),
-                reading.temperature,
-                reading.humidity,
-                reading.luminosity,
-            ),
-        )
-        self.conn.commit()
+        if not readings:
+            return
+        rows = [
+            (_to_us(r.timestamp), r.temperature, r.humidity, r.luminosity)
+            for r in readings
+        ]
+        self._write_many(_INSERT_READING_SQL, rows)
+        self._remember(rows)
+
+    def insert_columns(
+        self,
+        timestamps: Iterable[datetime],
+        temperatures: Iterable[float],
+        humidities: Iterable[float],
+        luminosities: Iterable[float],
+    ) -> None:
+        """
+        Inserta columnas completas de lecturas en una única transacción,
+        sin crear un SensorReading por fila (p. ej. al volcar un fichero).
+        """
+        assert self.conn is not None and self._insert_cur is not None
+        self.flush()
+        try:
+            self._insert_cur.executemany(
+                _INSERT_READING_SQL,
+                zip(map(_to_us, timestamps), temperatures, humidities, luminosities),
+            )
+            self.conn.commit()
+        except Exception:
+            # Todo o nada; sin rollback la conexión seguiría con la
+            # transacción abierta y el escritor encontraría la BD bloqueada
+            self.conn.rollback()
+            raise
+        # El caché ya no contiene las últimas filas: se vuelve a llenar
+        # con las siguientes insert_reading()
+        self._recent.clear()
 
-    def get_last_n_readings(self, n: int = 100) -> List[SensorReading]:
+    def get_last_n_readings(
+        self, n: int = 100, wait: bool = False
+    ) -> List[SensorReading]:
+        """
+        Últimas n lecturas en orden cronológico. Sin wait solo se ve lo ya
+        guardado por el escritor (no bloquea el hilo de la UI); con wait=True
+        se espera antes a que guarde lo encolado.
+        """
         assert self.conn is not None
-        cur = self.conn.cursor()
-        cur.execute(
-            """
-            SELECT timestamp, temperature, humidity, luminosity
-            FROM sensor_data
-            ORDER BY id DESC
-            LIMIT ?
-            """,
-            (n,),
-        )
-        rows = cur.fetchall()
-        readings: List[SensorReading] = []
-        for ts_str, temp, hum, lux in reversed(rows):
-            readings.append(
+        recent = self._recent
+        if self._recent_stale:
+            self._recent_stale = False
+            recent.clear()
+        if n <= len(recent):
+            # Las n últimas en memoria, en orden cronológico
+            return list(islice(reversed(recent), n))[::-1]
+
+        if wait:
+            self.flush()
+        with self.read() as conn:
+            cur = conn.execute(_LAST_N_READINGS_SQL, (n,))
+            return [
                 SensorReading(
-                    timestamp=datetime.fromisoformat(ts_str),
+                    timestamp=_from_us(ts_us),
                     temperature=temp,
                     humidity=hum,
                     luminosity=lux,
                 )
-            )
-        return readings
+                for ts_us, temp, hum, lux in cur
+            ]
+
+    def get_last_n_columns(self, n: int = 100, wait: bool = False) -> "np.ndarray":
+        """
+        Como get_last_n_readings pero en columnas: array estructurado de NumPy
+        (READING_COLUMNS_DTYPE) listo para pasar a las gráficas sin recorrer
+        objetos Python.
+        """
+        import numpy as np
+
+        assert self.conn is not None
+        if wait:
+            self.flush()
+        with self.read() as conn:
+            cur = conn.execute(_LAST_N_READINGS_SQL, (n,))
+            return np.fromiter(cur, dtype=READING_COLUMNS_DTYPE)
 
     # ==================== ALERTAS ====================
 
@@ -118,8 +477,6 @@ class Database:
         reading: lectura asociada (opcional)
         """
         assert self.conn is not None
-        cur = self.conn.cursor()
-
         if reading is not None:
             ts = reading.timestamp.isoformat()
             t = reading.temperature
@@ -129,29 +486,25 @@ class Database:
             ts = datetime.now().isoformat()
             t = h = l = None
 
-        cur.execute(
-            """
-            INSERT INTO alerts (timestamp, level, message, temperature, humidity, luminosity)
-            VALUES (?, ?, ?, ?, ?, ?)
-            """,
-            (ts, level, message, t, h, l),
-        )
-        self.conn.commit()
+        self._write(_INSERT_ALERT_SQL, (ts, level, message, t, h, l))
 
-    def get_last_alerts(self, n: int = 50) -> List[tuple]:
+    def get_last_alerts(self, n: int = 50, wait: bool = False) -> List[tuple]:
         """
         Devuelve las últimas n alertas como tuplas:
         (timestamp, level, message, temperature, humidity, luminosity)
+        wait=True: como en get_last_n_readings.
         """
         assert self.conn is not None
-        cur = self.conn.cursor()
-        cur.execute(
-            """
-            SELECT timestamp, level, message, temperature, humidity, luminosity
-            FROM alerts
-            ORDER BY id DESC
-            LIMIT ?
-            """,
-            (n,),
-        )
-        return cur.fetchall()
+        if wait:
+            self.flush()
+        with self.read() as conn:
+            cur = conn.execute(
+                """
+                SELECT timestamp, level, message, temperature, humidity, luminosity
+                FROM alerts
+                ORDER BY id DESC
+                LIMIT ?
+                """,
+                (n,),
+            )
+            return cur.fetchall()
@@ -1,16 +1,98 @@
 # export.py
 from __future__ import annotations
+import csv
 from pathlib import Path
-import pandas as pd
 from database import Database
 
+# Filas leídas de SQLite por bloque: la memoria queda en O(bloque)
+EXPORT_CHUNK_ROWS = 10_000
+
+COLUMNS = ["timestamp", "temperature", "humidity", "luminosity"]
+
+# timestamp (microsegundos Unix) formateado por SQLite como ISO 8601 exacto,
+# en hora local como el resto de la app
+_CSV_QUERY = """
+    SELECT
+        strftime('%Y-%m-%dT%H:%M:%S', timestamp / 1000000, 'unixepoch', 'localtime')
+            || printf('.%06d', timestamp % 1000000),
+        temperature, humidity, luminosity
+    FROM sensor_data
+    ORDER BY id ASC
+"""
+
+# timestamp (microsegundos Unix) como fecha serial de Excel en hora local:
+# días desde 1899-12-30 (día juliano 2415018.5)
+_EXCEL_QUERY = """
+    SELECT
+        julianday(timestamp / 1000000.0, 'unixepoch', 'localtime') - 2415018.5,
+        temperature, humidity, luminosity
+    FROM sensor_data
+    ORDER BY id ASC
+"""
+
 
 def export_to_excel(db: Database, output_file: Path) -> None:
-    assert db.conn is not None
-    query = """
-        SELECT timestamp, temperature, humidity, luminosity
-        FROM sensor_data
-        ORDER BY id ASC
     """
-    df = pd.read_sql_query(query, db.conn)
-    df.to_excel(output_file, index=False)
+    Excel escrito fila a fila con xlsxwriter en modo constant_memory:
+    sin pandas y con memoria O(bloque) también al escribir.
+    """
+    # xlsxwriter solo se carga al exportar
+    import xlsxwriter
+
+    assert db.conn is not None
+    db.flush()
+    workbook = xlsxwriter.Workbook(str(output_file), {"constant_memory": True})
+    try:
+        sheet = workbook.add_worksheet()
+        date_format = workbook.add_format({"num_format": "yyyy-mm-dd hh:mm:ss"})
+        sheet.set_column(0, 0, 20)
+        sheet.write_row(0, 0, COLUMNS)
+
+        row = 1
+        with db.read() as conn:
+            cur = conn.execute(_EXCEL_QUERY)
+            while chunk := cur.fetchmany(EXPORT_CHUNK_ROWS):
+                for serial, *values in chunk:
+                    sheet.write_number(row, 0, serial, date_format)
+                    sheet.write_row(row, 1, values)
+                    row += 1
+    finally:
+        workbook.close()
+
+
+def export_to_csv(db: Database, output_file: Path) -> None:
+    """CSV directo desde el cursor, sin pandas."""
+    assert db.conn is not None
+    db.flush()
+    with db.read() as conn, open(output_file, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(COLUMNS)
+        writer.writerows(conn.execute(_CSV_QUERY))
+
+
+def export_to_parquet(db: Database, output_file: Path) -> None:
+    """Parquet (columnar y comprimido) con pyarrow, escrito por bloques."""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    assert db.conn is not None
+    db.flush()
+    schema = pa.schema(
+        [
+            ("timestamp", pa.timestamp("us", tz="UTC")),
+            ("temperature", pa.float64()),
+            ("humidity", pa.float64()),
+            ("luminosity", pa.float64()),
+        ]
+    )
+    with db.read() as conn, pq.ParquetWriter(output_file, schema) as writer:
+        cur = conn.execute(
+            """
+            SELECT timestamp, temperature, humidity, luminosity
+            FROM sensor_data
+            ORDER BY id ASC
+            """
+        )
+        while rows := cur.fetchmany(EXPORT_CHUNK_ROWS):
+            columns = [list(col) for col in zip(*rows)]
+            writer.write_table(pa.Table.from_arrays(columns, schema=schema))
@@ -4,7 +4,8 @@ from dataclasses import dataclass
 from datetime import datetime
 
 
-@dataclass
+# slots: sin __dict__ por instancia (menos memoria y acceso más rápido)
+@dataclass(slots=True)
 class SensorReading:
     timestamp: datetime
     temperature: float
@@ -1,7 +1,13 @@
 # settings.py
+import copy
 import json
 from pathlib import Path
-from typing import Any, Dict
+from typing import Any, Dict, Optional
+
+try:  # opcional: codificador JSON en C, bastante más rápido que json
+    import orjson
+except ImportError:
+    orjson = None
 
 SETTINGS_FILE = Path("settings.json")
 
@@ -10,19 +16,32 @@ class SettingsManager:
     def __init__(self, path: Path = SETTINGS_FILE) -> None:
         self.path = path
         self._data: Dict[str, Any] = {}
+        # Contenido que hay en disco (None si no existe o no es JSON válido)
+        self._last_saved: Optional[Dict[str, Any]] = None
         self.load()
 
     def load(self) -> None:
+        self._data = {}
+        self._last_saved = None
         if self.path.exists():
             try:
-                self._data = json.loads(self.path.read_text(encoding="utf-8"))
+                if orjson is not None:
+                    self._data = orjson.loads(self.path.read_bytes())
+                else:
+                    self._data = json.loads(self.path.read_text(encoding="utf-8"))
+                self._last_saved = copy.deepcopy(self._data)
             except json.JSONDecodeError:
                 self._data = {}
-        else:
-            self._data = {}
 
     def save(self) -> None:
-        self.path.write_text(json.dumps(self._data, indent=4), encoding="utf-8")
+        # Sin cambios desde la última carga/guardado: no se toca el disco
+        if self._data == self._last_saved:
+            return
+        if orjson is not None:
+            self.path.write_bytes(orjson.dumps(self._data, option=orjson.OPT_INDENT_2))
+        else:
+            self.path.write_text(json.dumps(self._data, indent=4), encoding="utf-8")
+        self._last_saved = copy.deepcopy(self._data)
 
     def get(self, key: str, default: Any = None) -> Any:
         return self._data.get(key, default)
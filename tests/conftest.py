@@ -0,0 +1,11 @@
+# tests/conftest.py
+import os
+import sys
+
+# Los módulos viven en la raíz del repo (igual que hace app.py)
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if BASE_DIR not in sys.path:
+    sys.path.insert(0, BASE_DIR)
+
+# Sin pantalla: Qt en modo offscreen
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
@@ -0,0 +1,143 @@
+# tests/test_data_acquisition.py
+import sqlite3
+from datetime import datetime, timedelta
+
+import pytest
+
+import data_acquisition
+from data_acquisition import FileDataSource
+
+T0 = datetime(2024, 1, 1, 10, 0)
+
+# Más de un bloque de pyarrow (1 MB): el tipo de cada columna se decidía
+# con el primero
+N_ROWS = 40_000
+
+
+def _write_csv(path, bad_rows=()):
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("timestamp,temperature,humidity,luminosity\n")
+        for i in range(N_ROWS):
+            ts = "no-es-fecha" if i in bad_rows else (T0 + timedelta(seconds=i)).isoformat()
+            f.write(f"{ts},{20 + i % 10}.5,{40 + i % 7}.0,{300 + i}.0\n")
+    return path
+
+
+def _drain(source):
+    readings = []
+    while (reading := source.next_reading()) is not None:
+        readings.append(reading)
+    return readings
+
+
+# ===== Carga con pyarrow / pandas =====
+
+def test_arrow_load_survives_malformed_timestamp_late_in_file(tmp_path):
+    pytest.importorskip("pyarrow")
+    path = _write_csv(tmp_path / "big.csv", bad_rows={N_ROWS - 5})
+
+    before = datetime.now()
+    readings = _drain(FileDataSource(path))
+
+    assert len(readings) == N_ROWS
+    assert readings[0].timestamp == T0
+    assert readings[-1].timestamp == T0 + timedelta(seconds=N_ROWS - 1)
+    # La fila mala toma la hora actual, como antes
+    assert readings[N_ROWS - 5].timestamp >= before
+    assert readings[10].temperature == 20.5
+    assert readings[10].luminosity == 310.0
+
+
+def test_arrow_and_pandas_loaders_agree(tmp_path):
+    pytest.importorskip("pyarrow")
+    pytest.importorskip("pandas")
+    path = tmp_path / "small.csv"
+    path.write_text(
+        "timestamp,temperature,humidity,luminosity\n"
+        "2024-01-01T10:00:00,21.5,40,300\n"
+        "basura,22.0,,310\n"
+        "2024-01-01 10:02:00.250000,22.5,38,320\n",
+        encoding="utf-8",
+    )
+    arrow = FileDataSource(path)
+    pandas_source = FileDataSource(path)
+    pandas_source._load_pandas(path)
+
+    assert arrow._ts == pandas_source._ts
+    assert arrow._ts[1] is None
+    assert arrow._temp == pandas_source._temp
+    assert arrow._lux == pandas_source._lux
+    # Celda vacía -> NaN en ambos
+    assert arrow._hum[1] != arrow._hum[1]
+    assert pandas_source._hum[1] != pandas_source._hum[1]
+
+
+def test_missing_timestamp_column_uses_now(tmp_path):
+    path = tmp_path / "no_ts.csv"
+    path.write_text("temperature,humidity,luminosity\n21,40,300\n", encoding="utf-8")
+    before = datetime.now()
+    (reading,) = _drain(FileDataSource(path))
+    assert reading.timestamp >= before
+    assert reading.temperature == 21.0
+
+
+# ===== Lectura por bloques (CSV grandes) =====
+
+def test_stream_survives_malformed_timestamp_in_later_batch(tmp_path, monkeypatch):
+    pytest.importorskip("pyarrow")
+    monkeypatch.setattr(data_acquisition, "STREAM_THRESHOLD_BYTES", 0)
+    path = _write_csv(tmp_path / "big.csv", bad_rows={N_ROWS - 3})
+
+    source = FileDataSource(path)
+    assert source._reader is not None
+    readings = _drain(source)
+
+    assert len(readings) == N_ROWS
+    assert readings[-1].timestamp == T0 + timedelta(seconds=N_ROWS - 1)
+    assert readings[N_ROWS - 4].timestamp == T0 + timedelta(seconds=N_ROWS - 4)
+
+
+def test_stream_bulk_insert_matches_row_count(tmp_path, monkeypatch):
+    pytest.importorskip("pyarrow")
+    from database import Database
+
+    monkeypatch.setattr(data_acquisition, "STREAM_THRESHOLD_BYTES", 0)
+    path = _write_csv(tmp_path / "big.csv", bad_rows={7})
+    db = Database(tmp_path / "sensors.db")
+    db.connect()
+    try:
+        assert FileDataSource(path).bulk_insert(db) == N_ROWS
+        with db.read() as conn:
+            assert conn.execute("SELECT COUNT(*) FROM sensor_data").fetchone() == (N_ROWS,)
+    finally:
+        db.close()
+
+
+# ===== Volcado a la BD =====
+
+def test_failed_bulk_insert_does_not_block_later_writes(tmp_path):
+    from database import Database
+    from models import SensorReading
+
+    path = tmp_path / "hueco.csv"
+    path.write_text(
+        "timestamp,temperature,humidity,luminosity\n"
+        "2024-01-01T10:00:00,21.5,40,300\n"
+        "2024-01-01T10:01:00,22.0,,310\n",
+        encoding="utf-8",
+    )
+    db = Database(tmp_path / "sensors.db")
+    db.connect()
+    try:
+        # La celda vacía choca con NOT NULL: el volcado entero se deshace
+        with pytest.raises(sqlite3.IntegrityError):
+            FileDataSource(path).bulk_insert(db)
+        assert not db.conn.in_transaction
+
+        db.insert_reading(SensorReading(T0, 20.0, 50.0, 300.0))
+        db.flush()
+        assert db.take_writer_error() is None
+        with db.read() as conn:
+            assert conn.execute("SELECT COUNT(*) FROM sensor_data").fetchone() == (1,)
+    finally:
+        db.close()
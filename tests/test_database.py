@@ -0,0 +1,250 @@
+# tests/test_database.py
+import sqlite3
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+import database
+from database import READING_COLUMNS_DTYPE, Database, WriteError, _from_us, _to_us
+from models import SensorReading
+
+T0 = datetime(2024, 1, 1, 10, 0)
+NAN = float("nan")
+
+
+def _reading(i: int, temperature: float = 20.0) -> SensorReading:
+    return SensorReading(
+        timestamp=T0 + timedelta(minutes=i),
+        temperature=temperature,
+        humidity=50.0,
+        luminosity=300.0,
+    )
+
+
+def _count(db: Database, table: str) -> int:
+    with db.read() as conn:
+        return conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+
+
+@pytest.fixture
+def madrid_tz(monkeypatch):
+    """Hora local fija (UTC+1 en invierno) para que los tests no dependan del host."""
+    monkeypatch.setenv("TZ", "Europe/Madrid")
+    time.tzset()
+    yield
+    monkeypatch.undo()
+    time.tzset()
+
+
+@pytest.fixture
+def db(tmp_path):
+    database = Database(tmp_path / "sensors.db")
+    database.connect()
+    yield database
+    if database.conn is not None:
+        database.close()
+
+
+# ===== Hilo escritor =====
+
+def test_flush_makes_queued_rows_visible(db):
+    for i in range(20):
+        db.insert_reading(_reading(i))
+    db.insert_readings_many([_reading(i) for i in range(20, 30)])
+    db.flush()
+    assert _count(db, "sensor_data") == 30
+
+
+def test_bad_row_only_loses_itself(db):
+    for i in range(10):
+        db.insert_reading(_reading(i, NAN if i == 4 else 20.0 + i))
+    db.insert_alert(level="warning", message="T alta", reading=_reading(0))
+
+    db.flush()
+    assert _count(db, "sensor_data") == 9
+    assert _count(db, "alerts") == 1
+    # Ni flush() ni las lecturas lanzan: el error se recoge una sola vez
+    assert len(db.get_last_alerts()) == 1
+    error = db.take_writer_error()
+    assert isinstance(error, WriteError)
+    assert isinstance(error.__cause__, sqlite3.IntegrityError)
+    assert "fila descartada" in str(error)
+    assert db.take_writer_error() is None
+
+
+def test_writer_survives_non_sqlite_errors(db):
+    # 2**63 no cabe en un INTEGER de SQLite: OverflowError, no sqlite3.Error
+    db.insert_alert(level="warning", message="x", reading=_reading(0, 2**63))
+    db.insert_reading(_reading(1))
+    db.flush()
+    assert _count(db, "sensor_data") == 1
+    assert isinstance(db.take_writer_error().__cause__, OverflowError)
+    assert db._writer.is_alive()
+
+
+def test_reads_do_not_wait_for_the_writer_unless_asked(db, monkeypatch):
+    release = threading.Event()
+    execute_batch = database._execute_batch
+
+    def slow_batch(*args):
+        release.wait(5)
+        return execute_batch(*args)
+
+    monkeypatch.setattr(database, "_execute_batch", slow_batch)
+    db.insert_alert(level="warning", message="T alta", reading=_reading(0))
+    # El escritor está ocupado: se ve lo ya guardado, sin bloquear
+    assert db.get_last_alerts() == []
+    assert len(db.get_last_n_columns(10)) == 0
+    release.set()
+    assert len(db.get_last_alerts(wait=True)) == 1
+
+
+def test_bad_row_in_memory_database():
+    db = Database(Path(":memory:"))
+    db.connect()
+    db.insert_readings_many([_reading(0), _reading(1, NAN), _reading(2)])
+    assert _count(db, "sensor_data") == 2
+    assert isinstance(db.take_writer_error().__cause__, sqlite3.IntegrityError)
+    db.close()
+
+
+def test_close_saves_queued_rows_without_raising(db):
+    writer = db._writer
+    db.insert_reading(_reading(0, NAN))
+    db.insert_reading(_reading(1))
+    db.close()
+
+    assert db.conn is None
+    assert db._writer is None
+    assert not writer.is_alive()
+    assert db._readers.empty()
+    assert db.take_writer_error() is not None
+
+    db.connect()
+    assert _count(db, "sensor_data") == 1
+
+
+# ===== Lecturas en columnas =====
+
+def test_last_n_columns_in_chronological_order(db):
+    db.insert_readings_many([_reading(i, 20.0 + i) for i in range(5)])
+    db.flush()
+
+    cols = db.get_last_n_columns(3)
+    assert cols.dtype == np.dtype(READING_COLUMNS_DTYPE)
+    assert cols["t"].tolist() == [22.0, 23.0, 24.0]
+    assert cols["ts"].tolist() == [_to_us(_reading(i).timestamp) for i in (2, 3, 4)]
+
+    # n mayor que la tabla: todas las filas, sin relleno
+    assert db.get_last_n_columns(100)["t"].tolist() == [20.0, 21.0, 22.0, 23.0, 24.0]
+
+
+def test_last_n_columns_of_empty_table(db):
+    cols = db.get_last_n_columns(10)
+    assert cols.dtype == np.dtype(READING_COLUMNS_DTYPE)
+    assert len(cols) == 0
+
+
+# ===== Timestamps en microsegundos =====
+
+def test_naive_timestamps_are_local_time(madrid_tz):
+    ts = datetime(2024, 1, 1, 10, 0, 0, 123456)
+    us = _to_us(ts)
+    assert us == _to_us(datetime(2024, 1, 1, 9, 0, 0, 123456, tzinfo=timezone.utc))
+    assert _from_us(us) == ts
+
+
+def test_aware_and_naive_readings_keep_chronological_order(db, madrid_tz):
+    # 09:30 UTC = 10:30 en Madrid: va entre las dos lecturas locales
+    aware = SensorReading(
+        datetime(2024, 1, 1, 9, 30, tzinfo=timezone.utc), 21.0, 50.0, 300.0
+    )
+    db.insert_readings_many([_reading(0), aware, _reading(60)])
+    db.flush()
+    with db.read() as conn:
+        ordered = [
+            temp
+            for (temp,) in conn.execute(
+                "SELECT temperature FROM sensor_data ORDER BY timestamp"
+            )
+        ]
+    assert ordered == [20.0, 21.0, 20.0]
+    expected = [T0, datetime(2024, 1, 1, 10, 30), T0 + timedelta(hours=1)]
+    # Desde el caché y desde SQLite, con las mismas fechas locales sin zona
+    assert [r.timestamp for r in db.get_last_n_readings(3)] == expected
+    assert [r.timestamp for r in db.get_last_n_readings(4)] == expected
+    # Mezclarlas no lanza TypeError (aware contra naive)
+    mixed = db.get_last_n_readings(2) + db.get_last_n_readings(4)
+    assert sorted(r.timestamp for r in mixed)[0] == T0
+
+
+def test_recent_cache_forgets_rows_the_writer_dropped(db):
+    db.insert_readings_many([_reading(0), _reading(1, NAN), _reading(2)])
+    db.flush()
+    assert [r.temperature for r in db.get_last_n_readings(3)] == [20.0, 20.0]
+
+
+def test_text_timestamps_are_migrated(tmp_path, madrid_tz):
+    path = tmp_path / "old.db"
+    conn = sqlite3.connect(path)
+    conn.executescript(
+        """
+        CREATE TABLE sensor_data (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            timestamp TEXT NOT NULL,
+            temperature REAL NOT NULL,
+            humidity REAL NOT NULL,
+            luminosity REAL NOT NULL
+        );
+        CREATE TABLE alerts (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            timestamp TEXT NOT NULL,
+            level TEXT NOT NULL,
+            message TEXT NOT NULL,
+            temperature REAL,
+            humidity REAL,
+            luminosity REAL
+        );
+        INSERT INTO sensor_data VALUES (3, '2024-01-01T10:00:00', 20.0, 50.0, 300.0);
+        INSERT INTO sensor_data VALUES (7, '2024-01-01T10:01:00.500000', 21.0, 51.0, 310.0);
+        """
+    )
+    conn.commit()
+    conn.close()
+
+    db = Database(path)
+    db.connect()
+    try:
+        with db.read() as reader:
+            types = {
+                name: col_type
+                for _, name, col_type, *_ in reader.execute("PRAGMA table_info(sensor_data)")
+            }
+            rows = reader.execute(
+                "SELECT id, timestamp FROM sensor_data ORDER BY id"
+            ).fetchall()
+        assert types["timestamp"] == "INTEGER"
+        assert rows == [
+            (3, _to_us(datetime(2024, 1, 1, 10, 0))),
+            (7, _to_us(datetime(2024, 1, 1, 10, 1, 0, 500000))),
+        ]
+        assert [r.timestamp for r in db.get_last_n_readings(2)] == [
+            datetime(2024, 1, 1, 10, 0),
+            datetime(2024, 1, 1, 10, 1, 0, 500000),
+        ]
+        # Nuevas filas siguen a las migradas
+        db.insert_reading(_reading(5))
+        db.flush()
+        assert _count(db, "sensor_data") == 3
+    finally:
+        db.close()
+
+    # Reabrir no vuelve a migrar
+    db = Database(path)
+    db.connect()
+    assert _count(db, "sensor_data") == 3
+    db.close()
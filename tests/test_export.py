@@ -0,0 +1,70 @@
+# tests/test_export.py
+import csv
+import time
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from database import Database
+from export import COLUMNS, export_to_csv, export_to_excel, export_to_parquet
+from models import SensorReading
+
+T0 = datetime(2024, 1, 1, 10, 0, 0, 250000)
+
+
+@pytest.fixture
+def db(tmp_path, monkeypatch):
+    # Hora local fija: los ficheros exportados van en hora local
+    monkeypatch.setenv("TZ", "Europe/Madrid")
+    time.tzset()
+    database = Database(tmp_path / "sensors.db")
+    database.connect()
+    database.insert_readings_many(
+        [
+            SensorReading(T0 + timedelta(minutes=i), 20.0 + i, 50.0 - i, 300.0 + i)
+            for i in range(3)
+        ]
+    )
+    yield database
+    database.close()
+    monkeypatch.undo()
+    time.tzset()
+
+
+def test_export_to_csv(db, tmp_path):
+    out = tmp_path / "out.csv"
+    export_to_csv(db, out)
+    with open(out, newline="", encoding="utf-8") as f:
+        rows = list(csv.reader(f))
+    assert rows[0] == COLUMNS
+    assert rows[1] == ["2024-01-01T10:00:00.250000", "20.0", "50.0", "300.0"]
+    assert rows[3][0] == "2024-01-01T10:02:00.250000"
+    assert len(rows) == 4
+
+
+def test_export_to_excel(db, tmp_path):
+    pytest.importorskip("xlsxwriter")
+    openpyxl = pytest.importorskip("openpyxl")
+    out = tmp_path / "out.xlsx"
+    export_to_excel(db, out)
+    sheet = openpyxl.load_workbook(out).active
+    rows = list(sheet.iter_rows(values_only=True))
+    assert list(rows[0]) == COLUMNS
+    assert len(rows) == 4
+    ts, t, h, l = rows[2]
+    assert abs(ts - (T0 + timedelta(minutes=1))) < timedelta(milliseconds=1)
+    assert (t, h, l) == (21.0, 49.0, 301.0)
+
+
+def test_export_to_parquet(db, tmp_path):
+    pq = pytest.importorskip("pyarrow.parquet")
+    out = tmp_path / "out.parquet"
+    export_to_parquet(db, out)
+    table = pq.read_table(out)
+    assert table.column_names == COLUMNS
+    assert table.num_rows == 3
+    # Instante absoluto en UTC: 10:00 en Madrid (invierno) = 09:00 UTC
+    assert table.column("timestamp")[0].as_py() == datetime(
+        2024, 1, 1, 9, 0, 0, 250000, tzinfo=timezone.utc
+    )
+    assert table.column("luminosity").to_pylist() == [300.0, 301.0, 302.0]
@@ -0,0 +1,61 @@
+# tests/test_settings.py
+import json
+
+import pytest
+
+import settings
+from settings import SettingsManager
+
+
+@pytest.fixture(params=["orjson", "json"])
+def backend(request, monkeypatch):
+    """Cada test se ejecuta con orjson (si está instalado) y con json."""
+    if request.param == "orjson":
+        pytest.importorskip("orjson")
+    else:
+        monkeypatch.setattr(settings, "orjson", None)
+    return request.param
+
+
+def test_round_trip(tmp_path, backend):
+    path = tmp_path / "settings.json"
+    manager = SettingsManager(path)
+    manager.set("dark_mode", True)
+    manager.set("interval_ms", 250)
+    manager.save()
+
+    # Fichero JSON normal, legible con el json de la biblioteca estándar
+    assert json.loads(path.read_text(encoding="utf-8")) == {
+        "dark_mode": True,
+        "interval_ms": 250,
+    }
+    assert SettingsManager(path).get("interval_ms") == 250
+
+
+def test_save_skips_unchanged_settings(tmp_path, backend):
+    path = tmp_path / "settings.json"
+    path.write_text('{"dark_mode": false}', encoding="utf-8")
+    manager = SettingsManager(path)
+
+    # Marca para detectar si save() reescribe el fichero
+    path.write_text("sin tocar", encoding="utf-8")
+    manager.save()
+    manager.set("dark_mode", False)
+    manager.save()
+    assert path.read_text(encoding="utf-8") == "sin tocar"
+
+    manager.set("dark_mode", True)
+    manager.save()
+    assert json.loads(path.read_text(encoding="utf-8")) == {"dark_mode": True}
+
+
+def test_missing_or_invalid_file_is_written_on_save(tmp_path, backend):
+    path = tmp_path / "settings.json"
+    SettingsManager(path).save()
+    assert json.loads(path.read_text(encoding="utf-8")) == {}
+
+    path.write_text("{roto", encoding="utf-8")
+    manager = SettingsManager(path)
+    assert manager.get("dark_mode", "def") == "def"
+    manager.save()
+    assert json.loads(path.read_text(encoding="utf-8")) == {}
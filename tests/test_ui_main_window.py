@@ -0,0 +1,306 @@
+# tests/test_ui_main_window.py
+import math
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+pytest.importorskip("PySide6")
+pytest.importorskip("matplotlib")
+
+from PySide6.QtWidgets import QApplication, QLabel
+
+from database import Database
+from models import SensorReading
+from settings import SettingsManager
+from ui_main_window import (
+    AcquisitionWorker,
+    MainWindow,
+    _ALERT_NORMAL_TEXT,
+    _ReadingRing,
+    _SlidingStats,
+    _downsample,
+    _set_if_changed,
+)
+
+NAN = float("nan")
+
+
+@pytest.fixture
+def qapp():
+    return QApplication.instance() or QApplication([])
+
+
+def _reference(window):
+    finite = [v for v in window if math.isfinite(v)]
+    if not finite:
+        return NAN, NAN, NAN
+    return sum(finite) / len(finite), min(finite), max(finite)
+
+
+def _push(stats, values, i, size):
+    """Empuja values[i] pasando el valor que sale, como hace MainWindow."""
+    if i >= size:
+        stats.push(values[i], values[i - size])
+    else:
+        stats.push(values[i])
+
+
+def _assert_stats(stats, expected):
+    for got, want in zip((stats.mean, stats.min, stats.max), expected):
+        if math.isnan(want):
+            assert math.isnan(got)
+        else:
+            assert got == pytest.approx(want)
+
+
+# ===== _SlidingStats =====
+
+def test_sliding_stats_matches_window():
+    values = [5, 2, 8, 8, 1, 9, 3, 3, 7, 0, 6]
+    stats = _SlidingStats(4)
+    for i in range(len(values)):
+        _push(stats, values, i, 4)
+        _assert_stats(stats, _reference(values[max(0, i - 3) : i + 1]))
+    assert len(stats) == 4
+
+
+def test_sliding_stats_nan_inside_window_is_ignored():
+    stats = _SlidingStats(3)
+    values = [5, NAN, 3]
+    for i in range(3):
+        _push(stats, values, i, 3)
+    # 3.0 está en la ventana: el NaN no debe tapar el mínimo
+    assert stats.min == 3.0
+    assert stats.max == 5.0
+    assert stats.mean == pytest.approx(4.0)
+
+
+def test_sliding_stats_recovers_after_nan_leaves_window():
+    values = [5, NAN, 3, 4, 6, 7, 8, 1]
+    stats = _SlidingStats(3)
+    for i in range(len(values)):
+        _push(stats, values, i, 3)
+        _assert_stats(stats, _reference(values[max(0, i - 2) : i + 1]))
+    assert (stats.min, stats.max) == (1, 8)
+
+
+def test_sliding_stats_all_non_finite():
+    stats = _SlidingStats(2)
+    values = [NAN, math.inf, 2.5]
+    for i in range(2):
+        _push(stats, values, i, 2)
+    _assert_stats(stats, (NAN, NAN, NAN))
+    _push(stats, values, 2, 2)
+    _assert_stats(stats, (2.5, 2.5, 2.5))
+
+
+def test_sliding_stats_clear():
+    stats = _SlidingStats(3)
+    values = [1, 2, 3, 4]
+    for i in range(4):
+        _push(stats, values, i, 3)
+    stats.clear()
+    assert len(stats) == 0
+    stats.push(10)
+    _assert_stats(stats, (10, 10, 10))
+
+
+# ===== _ReadingRing =====
+
+T0 = datetime(2024, 1, 1, 10, 0)
+
+
+def _reading(i: int) -> SensorReading:
+    return SensorReading(T0 + timedelta(seconds=i), 20.0 + i, 50.0 - i, 300.0 + i)
+
+
+def test_reading_ring_window_is_contiguous_and_chronological():
+    ring = _ReadingRing(4)
+    assert len(ring) == 0
+    evicted = [ring.append(_reading(i)) for i in range(7)]
+
+    # Sale la más antigua en cuanto la ventana está llena
+    assert evicted[:4] == [None] * 4
+    assert evicted[4:] == [(20.0, 50.0, 300.0), (21.0, 49.0, 301.0), (22.0, 48.0, 302.0)]
+
+    times, temps, hums, luxs = ring.columns()
+    assert len(ring) == 4
+    assert temps.tolist() == [23.0, 24.0, 25.0, 26.0]
+    assert luxs.tolist() == [303.0, 304.0, 305.0, 306.0]
+    assert times[0] == np.datetime64(T0 + timedelta(seconds=3), "us")
+    # Vistas del buffer, sin copia
+    assert temps.base is not None and temps.flags["C_CONTIGUOUS"]
+    assert ring.last() == (26.0, 44.0, 306.0)
+
+
+def test_reading_ring_clear():
+    ring = _ReadingRing(3)
+    for i in range(5):
+        ring.append(_reading(i))
+    ring.clear()
+    assert len(ring) == 0
+    assert ring.append(_reading(9)) is None
+    assert ring.columns()[1].tolist() == [29.0]
+    assert ring.last() == (29.0, 41.0, 309.0)
+
+
+# ===== _downsample (LTTB) =====
+
+def test_downsample_short_series_is_untouched():
+    x = np.arange(100.0)
+    y = np.sin(x)
+    xs, ys = _downsample(x, y, n_out=100)
+    assert xs is x and ys is y
+
+
+def test_downsample_keeps_endpoints_order_and_peaks():
+    n = 10_000
+    x = np.datetime64("2024-01-01T00:00", "us") + np.arange(n) * np.timedelta64(1, "s")
+    y = np.sin(np.arange(n) / 300.0)
+    y[6_123] = 50.0  # pico aislado
+    y[2_345] = -50.0
+
+    xs, ys = _downsample(x, y, n_out=500)
+
+    assert len(xs) == len(ys) == 500
+    assert xs.dtype == x.dtype
+    assert xs[0] == x[0] and xs[-1] == x[-1]
+    assert ys[0] == y[0] and ys[-1] == y[-1]
+    assert np.all(np.diff(xs.astype(np.int64)) > 0)
+    assert 50.0 in ys and -50.0 in ys
+    # Los puntos elegidos son puntos reales de la serie
+    idx = (xs - x[0]) // np.timedelta64(1, "s")
+    assert np.array_equal(y[idx], ys)
+
+
+# ===== _set_if_changed =====
+
+class _CountingLabel(QLabel):
+    calls = 0
+
+    def setText(self, text):
+        self.calls += 1
+        super().setText(text)
+
+
+def test_set_if_changed_only_calls_set_text_on_change(qapp):
+    label = _CountingLabel()
+    for text in ["μ: 20.0", "μ: 20.0", "μ: 21.0", "μ: 21.0", "μ: 20.0"]:
+        _set_if_changed(label, text)
+
+    assert label.calls == 3
+    assert label.text() == "μ: 20.0"
+
+
+# ===== AcquisitionWorker =====
+
+class _FailingSource:
+    def __init__(self, good: int) -> None:
+        self.good = good
+
+    def next_reading(self):
+        if self.good == 0:
+            raise ValueError("bloque ilegible")
+        self.good -= 1
+        return object()
+
+
+def test_worker_reports_source_errors():
+    worker = AcquisitionWorker(_FailingSource(good=2), interval_ms=0)
+    readings, errors, finished = [], [], []
+    worker.reading_ready.connect(readings.append)
+    worker.failed.connect(errors.append)
+    worker.finished.connect(lambda: finished.append(True))
+
+    worker.run()  # en este hilo: conexiones directas
+
+    assert len(readings) == 2
+    assert errors == ["bloque ilegible"]
+    assert finished == []
+
+
+# ===== MainWindow =====
+
+@pytest.fixture
+def window(qapp, tmp_path):
+    db = Database(Path(":memory:"))
+    db.connect()
+    win = MainWindow(db=db, settings=SettingsManager(tmp_path / "settings.json"))
+    yield win
+    win.close()
+    db.close()
+    qapp.processEvents()
+
+
+def _sensor(i: int, t: float = 21.0, h: float = 50.0, l: float = 300.0) -> SensorReading:
+    return SensorReading(datetime(2024, 1, 1, 10, 0) + timedelta(seconds=i), t, h, l)
+
+
+def test_nan_reading_keeps_the_view_refreshing(window):
+    window._on_reading(_sensor(0, t=25.0))
+    window._refresh_view()
+    window._on_reading(_sensor(1, t=NAN, h=NAN, l=NAN))
+    window._refresh_view()  # int(nan) abortaba aquí el refresco
+
+    # El gauge conserva el último valor válido; las estadísticas y la
+    # etiqueta sí se actualizan
+    assert window.temp_gauge.value() == 25
+    assert window.lbl_temp_stats.text() == "μ: 25.0   min: 25.0   max: 25.0"
+    assert "T=nan°C" in window.info_label.text()
+
+    window._on_reading(_sensor(2, t=27.0))
+    window._refresh_view()
+    assert window.temp_gauge.value() == 27
+
+
+def test_db_buffer_is_flushed_by_age(window):
+    window._on_reading(_sensor(0))
+    window._refresh_view()
+    assert window._db_buffer  # recién llegada: sigue en el búfer
+
+    window._db_buffer_since -= window._db_flush_age_s
+    window._refresh_view()
+    assert window._db_buffer == []
+    assert len(window.db.get_last_n_columns(10)) == 1
+
+
+# ===== Alertas (solo se guardan los cambios de nivel) =====
+
+def _alert_levels(window):
+    return [level for _, level, *_ in reversed(window.db.get_last_alerts(100))]
+
+
+def test_alerts_are_stored_on_level_transitions_only(window):
+    for i, t in enumerate([21.0, 31.0, 32.0, 33.0, 36.0, 37.0, 31.0]):
+        window._update_alerts(_sensor(i, t=t))
+
+    assert _alert_levels(window) == ["warning", "critical", "warning"]
+    assert window._last_alert_level == "warning"
+    # El texto sí sigue al último valor aunque el nivel no cambie
+    assert "31.0" in window.alert_label.text()
+
+
+def test_sustained_level_updates_label_without_new_rows(window):
+    window._update_alerts(_sensor(0, h=25.0))
+    window._update_alerts(_sensor(1, h=24.0))
+
+    assert _alert_levels(window) == ["warning"]
+    assert "24.0" in window.alert_label.text()
+
+
+def test_return_to_normal_rearms_the_alert(window):
+    window._update_alerts(_sensor(0, l=900.0))
+    window._update_alerts(_sensor(1))
+    assert window._last_alert_level == "normal"
+    assert window.alert_label.text() == _ALERT_NORMAL_TEXT
+
+    window._update_alerts(_sensor(2, l=900.0))
+    window._reset_indicators()
+    window._update_alerts(_sensor(3, l=1200.0))
+    window._reset_indicators()
+    window._update_alerts(_sensor(4, l=1200.0))
+
+    # La vuelta a normal no se guarda; cada nuevo cambio de nivel sí
+    assert _alert_levels(window) == ["warning", "warning", "critical", "critical"]
@@ -1,9 +1,16 @@
 # ui_main_window.py
 from __future__ import annotations
 
+import math
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from datetime import datetime, timezone
 from pathlib import Path
-from typing import Optional, List
-import statistics as stats
+from typing import Deque, Iterator, Optional, List, Tuple
+
+import numpy as np
 
 from PySide6.QtWidgets import (
     QMainWindow,
@@ -21,21 +28,282 @@ from PySide6.QtWidgets import (
     QSizePolicy,
     QProgressBar,
 )
-from PySide6.QtCore import QTimer, Qt
-
-from matplotlib.backends.backend_qtagg import (
-    FigureCanvasQTAgg as FigureCanvas,
-    NavigationToolbar2QT,
+from PySide6.QtCore import (
+    QCoreApplication,
+    QEvent,
+    QObject,
+    QThread,
+    QTimer,
+    Qt,
+    Signal,
+    Slot,
 )
-from matplotlib.figure import Figure
 
 from database import Database
 from data_acquisition import FileDataSource
 from models import SensorReading
-from export import export_to_excel
+from export import export_to_csv, export_to_excel, export_to_parquet
 from settings import SettingsManager
 
 
+# ====== ESTILOS (se construyen una vez, no en cada tick) ======
+# Gauges según su propiedad dinámica "state" (rojo, ámbar, verde); va dentro
+# de la hoja de estilo de la ventana en ambos temas
+_GAUGE_STATE_STYLE = """
+QProgressBar[state="crit"]::chunk { background-color: #ff3b30; }
+QProgressBar[state="warn"]::chunk { background-color: #ffcc00; }
+QProgressBar[state="ok"]::chunk { background-color: #34c759; }
+"""
+
+# Panel de alerta por nivel
+_STYLE_CRITICAL = (
+    "background-color: #ff3b30; color: white; font-weight: 700;"
+    " padding: 4px; border-radius: 4px;"
+)
+_STYLE_WARNING = (
+    "background-color: #ffcc00; color: black; font-weight: 700;"
+    " padding: 4px; border-radius: 4px;"
+)
+_STYLE_NORMAL = (
+    "background-color: #34c759; color: black; font-weight: 700;"
+    " padding: 4px; border-radius: 4px;"
+)
+_ALERT_STYLES = {
+    "critical": _STYLE_CRITICAL,
+    "warning": _STYLE_WARNING,
+    "normal": _STYLE_NORMAL,
+}
+
+# Prefijos del texto de alerta (panel y barra de estado)
+_ALERT_PREFIX = {"critical": "⚠ ALERTA CRÍTICA: ", "warning": "⚠ ALERTA: "}
+_STATUS_PREFIX = {"critical": "ALERTA CRÍTICA: ", "warning": "Alerta: "}
+_ALERT_NORMAL_TEXT = "Estado del sistema: NORMAL"
+
+
+def _set_gauge_state(gauge: QProgressBar, state: str) -> None:
+    """Cambia el estado del gauge y re-aplica la hoja de estilo solo a él."""
+    gauge.setProperty("state", state)
+    style = gauge.style()
+    style.unpolish(gauge)
+    style.polish(gauge)
+
+
+def _set_if_changed(label: QLabel, text: str) -> None:
+    """setText solo si el texto cambia: evita pasar el mismo str a Qt en cada tick."""
+    if getattr(label, "_cached_text", None) != text:
+        label._cached_text = text
+        label.setText(text)
+
+
+class _SlidingStats:
+    """
+    Media, mínimo y máximo de las últimas `size` muestras en O(1) por muestra:
+    suma acumulada (se resta lo que sale de la ventana) y dos deques
+    monótonos de (índice, valor) para el mínimo y el máximo, que se vacían
+    por índice al salir de la ventana.
+
+    Los valores no se guardan aquí: con la ventana llena, quien llama pasa
+    en `old` el valor que sale (lo tiene _ReadingRing).
+
+    Los valores no finitos (NaN de una celda vacía, inf) ocupan su hueco en
+    la ventana pero no entran en la suma ni en los deques; si no queda
+    ninguno finito, mean/min/max devuelven NaN.
+    """
+
+    def __init__(self, size: int) -> None:
+        self._size = size
+        self._count = 0  # muestras empujadas desde el último clear()
+        self._finite = 0  # valores finitos dentro de la ventana
+        self._sum = 0.0
+        self._min: Deque[Tuple[int, float]] = deque()  # creciente: mínimo en [0]
+        self._max: Deque[Tuple[int, float]] = deque()  # decreciente: máximo en [0]
+
+    def clear(self) -> None:
+        self._count = 0
+        self._finite = 0
+        self._sum = 0.0
+        self._min.clear()
+        self._max.clear()
+
+    def push(self, x: float, old: float = math.nan) -> None:
+        i = self._count
+        self._count = i + 1
+        if i >= self._size:
+            if math.isfinite(old):
+                self._sum -= old
+                self._finite -= 1
+            # Fuera de la ventana queda todo índice <= i - size
+            first = i - self._size
+            if self._min and self._min[0][0] <= first:
+                self._min.popleft()
+            if self._max and self._max[0][0] <= first:
+                self._max.popleft()
+        if not math.isfinite(x):
+            return
+
+        self._sum += x
+        self._finite += 1
+        while self._min and self._min[-1][1] > x:
+            self._min.pop()
+        self._min.append((i, x))
+        while self._max and self._max[-1][1] < x:
+            self._max.pop()
+        self._max.append((i, x))
+
+    def __len__(self) -> int:
+        return min(self._count, self._size)
+
+    @property
+    def mean(self) -> float:
+        return self._sum / self._finite if self._finite else math.nan
+
+    @property
+    def min(self) -> float:
+        return self._min[0][1] if self._min else math.nan
+
+    @property
+    def max(self) -> float:
+        return self._max[0][1] if self._max else math.nan
+
+
+class _ReadingRing:
+    """
+    Últimas `size` lecturas en columnas NumPy preasignadas (SoA).
+    Cada muestra se escribe dos veces (en i y en i + size), así la ventana
+    en orden cronológico es siempre un slice contiguo: vistas, sin copias.
+    """
+
+    def __init__(self, size: int) -> None:
+        self._size = size
+        self._ts = np.empty(2 * size, dtype="datetime64[us]")
+        self._t = np.empty(2 * size, dtype=np.float64)
+        self._h = np.empty(2 * size, dtype=np.float64)
+        self._l = np.empty(2 * size, dtype=np.float64)
+        self._head = 0  # siguiente posición de escritura, en [0, size)
+        self._n = 0
+
+    def clear(self) -> None:
+        self._head = 0
+        self._n = 0
+
+    def append(self, reading: SensorReading) -> Optional[Tuple[float, float, float]]:
+        """Añade la lectura; con la ventana llena devuelve (t, h, l) de la que sale."""
+        i = self._head
+        j = i + self._size
+        evicted = None
+        if self._n == self._size:
+            evicted = (float(self._t[i]), float(self._h[i]), float(self._l[i]))
+        self._ts[i] = self._ts[j] = _to_datetime64(reading.timestamp)
+        self._t[i] = self._t[j] = reading.temperature
+        self._h[i] = self._h[j] = reading.humidity
+        self._l[i] = self._l[j] = reading.luminosity
+        self._head = (i + 1) % self._size
+        if self._n < self._size:
+            self._n += 1
+        return evicted
+
+    def __len__(self) -> int:
+        return self._n
+
+    def last(self) -> Tuple[float, float, float]:
+        """(temperatura, humedad, lux) de la última lectura."""
+        i = self._head - 1 + self._size
+        return float(self._t[i]), float(self._h[i]), float(self._l[i])
+
+    def columns(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """(timestamps, temperaturas, humedades, luxes) de la más antigua a la última."""
+        end = self._head + self._size
+        window = slice(end - self._n, end)
+        return self._ts[window], self._t[window], self._h[window], self._l[window]
+
+
+def _to_datetime64(ts: datetime) -> np.datetime64:
+    # Matplotlib ya pintaba las fechas con zona en UTC: se guardan así
+    if ts.tzinfo is not None:
+        ts = ts.astimezone(timezone.utc).replace(tzinfo=None)
+    return np.datetime64(ts, "us")
+
+
+# Puntos por línea a partir de los cuales se reduce la serie antes de pintar
+_PLOT_POINTS = 500
+
+
+def _downsample(
+    x: np.ndarray, y: np.ndarray, n_out: int = _PLOT_POINTS
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Largest-Triangle-Three-Buckets: deja n_out puntos (primero y último
+    incluidos) eligiendo en cada cubo el que forma el triángulo de mayor
+    área con el punto anterior elegido y la media del cubo siguiente.
+    """
+    n = len(y)
+    if n <= n_out or n_out < 3:
+        return x, y
+
+    xf = x.view(np.int64) if x.dtype.kind == "M" else x
+    xf = xf.astype(np.float64)
+
+    # n_out - 2 cubos entre el primer y el último punto; el último "cubo"
+    # es solo el punto final, para la media del penúltimo
+    edges = np.empty(n_out, dtype=np.intp)
+    edges[:-1] = np.linspace(1, n - 1, n_out - 1).astype(np.intp)
+    edges[-1] = n
+    counts = np.diff(edges)
+    x_avg = np.add.reduceat(xf, edges[:-1]) / counts
+    y_avg = np.add.reduceat(y, edges[:-1]) / counts
+
+    idx = np.empty(n_out, dtype=np.intp)
+    idx[0] = a = 0
+    idx[-1] = n - 1
+    for i in range(n_out - 2):
+        lo, hi = edges[i], edges[i + 1]
+        xa, ya = xf[a], y[a]
+        area = np.abs(
+            (xa - x_avg[i + 1]) * (y[lo:hi] - ya)
+            - (xa - xf[lo:hi]) * (y_avg[i + 1] - ya)
+        )
+        a = lo + int(area.argmax())
+        idx[i + 1] = a
+    return x[idx], y[idx]
+
+
+class AcquisitionWorker(QObject):
+    """
+    Lee la fuente desde un QThread propio, para que las lecturas de fichero
+    no bloqueen el bucle de eventos de la interfaz. Cada lectura se emite
+    con reading_ready (conexión en cola al hilo GUI), que la guarda en la BD
+    por lotes. Si la fuente falla (p. ej. un bloque ilegible de un CSV
+    grande), el hilo termina y emite failed con el mensaje.
+    """
+
+    reading_ready = Signal(object)
+    finished = Signal()
+    failed = Signal(str)
+
+    def __init__(self, source: FileDataSource, interval_ms: int) -> None:
+        super().__init__()
+        self.source = source
+        self.interval_ms = interval_ms  # se puede cambiar en marcha
+        self._stop = threading.Event()
+
+    @Slot()
+    def run(self) -> None:
+        # wait() devuelve True en cuanto se pide parar, sin esperar al intervalo
+        while not self._stop.wait(self.interval_ms / 1000):
+            try:
+                reading = self.source.next_reading()
+            except Exception as e:
+                self.failed.emit(str(e))
+                return
+            if reading is None:
+                self.finished.emit()
+                return
+            self.reading_ready.emit(reading)
+
+    def stop(self) -> None:
+        self._stop.set()
+
+
 class MainWindow(QMainWindow):
     def __init__(self, db: Database, settings: SettingsManager, parent=None) -> None:
         super().__init__(parent)
@@ -56,14 +324,52 @@ class MainWindow(QMainWindow):
         self.ALERT_LUX_HIGH = 800.0      # lux
         self.ALERT_LUX_CRITICAL = 1000.0 # lux
 
+        # Umbrales de aviso con la humedad cambiada de signo: "baja" pasa a
+        # ser ">=" como en los otros canales (filtro rápido de _update_alerts)
+        self._alert_hi = (
+            self.ALERT_TEMP_HIGH,
+            -self.ALERT_HUM_LOW,
+            self.ALERT_LUX_HIGH,
+        )
+
+        # Último nivel de alerta: la BD solo guarda los cambios de nivel
+        self._last_alert_level = "normal"
+
         # Fuente de datos y lecturas
         self.data_source: Optional[FileDataSource] = None
-        self.readings: List[SensorReading] = []
-
-        # Timer de actualización (ms)
-        self.timer = QTimer(self)
-        self.timer.setInterval(1000)
-        self.timer.timeout.connect(self._update_data)
+        # Ventana deslizante en columnas NumPy (gráficas y última lectura);
+        # el histórico completo está en la BD
+        self._ring = _ReadingRing(self.stats_window)
+        # Estadísticas incrementales de la ventana deslizante
+        self._temp_stats = _SlidingStats(self.stats_window)
+        self._hum_stats = _SlidingStats(self.stats_window)
+        self._lux_stats = _SlidingStats(self.stats_window)
+
+        # Última banda de color aplicada a cada gauge (None = ninguna aún)
+        self._temp_band: Optional[str] = None
+        self._hum_band: Optional[str] = None
+        self._lux_band: Optional[str] = None
+
+        # Adquisición en segundo plano (se crea en start_stream)
+        self._interval_ms = 1000
+        self._worker: Optional[AcquisitionWorker] = None
+        self._worker_thread: Optional[QThread] = None
+
+        # Lecturas pendientes de guardar: se insertan en la BD de
+        # _db_flush_threshold en _db_flush_threshold (una transacción), o
+        # antes si la más antigua lleva _db_flush_age_s segundos esperando
+        self._db_buffer: List[SensorReading] = []
+        self._db_flush_threshold = 50
+        self._db_flush_age_s = 1.0
+        self._db_buffer_since = 0.0  # time.monotonic() de la más antigua
+
+        # Timer de refresco de la vista (~20 Hz como máximo), independiente
+        # del ritmo de lectura; solo redibuja si hay lecturas nuevas.
+        self._dirty = False
+        self.draw_timer = QTimer(self)
+        self.draw_timer.setInterval(50)
+        self.draw_timer.timeout.connect(self._refresh_view)
+        self.draw_timer.timeout.connect(self._report_db_error)
 
         # ===================== LAYOUT PRINCIPAL =====================
         central = QWidget(self)
@@ -79,19 +385,29 @@ class MainWindow(QMainWindow):
         self.btn_load = QPushButton("📂 Cargar CSV/JSON")
         self.btn_start = QPushButton("▶ Iniciar")
         self.btn_stop = QPushButton("⏸ Detener")
-        self.btn_export = QPushButton("📤 Exportar a Excel")
+        self.btn_fast = QPushButton("⏩ Volcado rápido")
+        self.btn_fast.setToolTip("Inserta de golpe en la BD el resto del fichero")
+        self.btn_export = QPushButton("📤 Exportar")
         self.dark_mode_check = QCheckBox("🌙 Modo oscuro")
 
         self.btn_start.setEnabled(False)
         self.btn_stop.setEnabled(False)
+        self.btn_fast.setEnabled(False)
 
         self.btn_load.clicked.connect(self.load_file)
         self.btn_start.clicked.connect(self.start_stream)
         self.btn_stop.clicked.connect(self.stop_stream)
+        self.btn_fast.clicked.connect(self.fast_replay)
         self.btn_export.clicked.connect(self.export_excel)
         self.dark_mode_check.stateChanged.connect(self.toggle_dark_mode)
 
-        for btn in (self.btn_load, self.btn_start, self.btn_stop, self.btn_export):
+        for btn in (
+            self.btn_load,
+            self.btn_start,
+            self.btn_stop,
+            self.btn_fast,
+            self.btn_export,
+        ):
             btn.setCursor(Qt.PointingHandCursor)
             btn.setMinimumHeight(30)
 
@@ -105,6 +421,7 @@ class MainWindow(QMainWindow):
         top_layout.addWidget(self.btn_load)
         top_layout.addWidget(self.btn_start)
         top_layout.addWidget(self.btn_stop)
+        top_layout.addWidget(self.btn_fast)
         top_layout.addStretch()
         top_layout.addWidget(self.btn_export)
         top_layout.addWidget(self.dark_mode_check)
@@ -120,7 +437,7 @@ class MainWindow(QMainWindow):
         self.spin_interval.setSingleStep(200)
 
         # valor inicial (1000 ms)
-        self.spin_interval.setValue(self.timer.interval())
+        self.spin_interval.setValue(self._interval_ms)
 
         # 👇 muy importante: ancho mínimo y alineación
         self.spin_interval.setMinimumWidth(80)
@@ -212,7 +529,7 @@ class MainWindow(QMainWindow):
         alert_layout = QHBoxLayout(alert_frame)
         alert_layout.setContentsMargins(10, 4, 10, 4)
 
-        self.alert_label = QLabel("Estado del sistema: NORMAL")
+        self.alert_label = QLabel(_ALERT_NORMAL_TEXT)
         self.alert_label.setAlignment(Qt.AlignCenter)
         self.alert_label.setObjectName("alertLabel")
 
@@ -220,6 +537,15 @@ class MainWindow(QMainWindow):
         main_layout.addWidget(alert_frame)
 
         # --------- FIGURA MATPLOTLIB + TOOLBAR ----------
+        # matplotlib se carga al crear la ventana, no al importar el módulo
+        from matplotlib.backends.backend_qtagg import (
+            FigureCanvasQTAgg as FigureCanvas,
+            NavigationToolbar2QT,
+        )
+        from matplotlib.figure import Figure
+        import matplotlib.dates as mdates
+
+        self._date2num = mdates.date2num
         self.figure = Figure(figsize=(7, 5))
         self.canvas = FigureCanvas(self.figure)
         self.canvas.setSizePolicy(
@@ -230,7 +556,27 @@ class MainWindow(QMainWindow):
         self.ax_temp = self.figure.add_subplot(3, 1, 1)
         self.ax_hum = self.figure.add_subplot(3, 1, 2)
         self.ax_lux = self.figure.add_subplot(3, 1, 3)
+
+        # Líneas persistentes (animated: se pintan por blitting, no en draw())
+        self._plot_axes = (self.ax_temp, self.ax_hum, self.ax_lux)
+        (self._line_temp,) = self.ax_temp.plot([], [], animated=True)
+        (self._line_hum,) = self.ax_hum.plot([], [], animated=True)
+        (self._line_lux,) = self.ax_lux.plot([], [], animated=True)
+        self._plot_lines = (self._line_temp, self._line_hum, self._line_lux)
+        for ax in self._plot_axes:
+            ax.xaxis_date()
+            ax.grid(True)
+        self.ax_temp.set_ylabel("Temp (°C)")
+        self.ax_hum.set_ylabel("Humedad (%)")
+        self.ax_lux.set_ylabel("Lux")
+        self.ax_lux.set_xlabel("Tiempo")
         self.figure.tight_layout()
+        self.figure.autofmt_xdate()
+
+        # Fondos (ejes, ticks, textos) capturados tras cada redibujado completo
+        self._plot_backgrounds: Optional[list] = None
+        self._plot_needs_rescale = True
+        self.canvas.mpl_connect("draw_event", self._on_canvas_draw)
 
         self.toolbar = NavigationToolbar2QT(self.canvas, self)
         self.toolbar.setToolButtonStyle(Qt.ToolButtonTextBesideIcon)
@@ -282,14 +628,18 @@ class MainWindow(QMainWindow):
         self._set_data_source(path, source_type)
 
     def _set_data_source(self, path: Path, source_type: str = "csv") -> None:
+        if self._worker is not None:
+            self.stop_stream()
         try:
             self.data_source = FileDataSource(path, source_type=source_type)  # type: ignore[arg-type]
-            self.readings.clear()
-            self._clear_axes()
-            self._reset_indicators()
-            self.btn_start.setEnabled(True)
-            self.btn_stop.setEnabled(False)
-            self.info_label.setText(f"Fuente de datos: {path.name}")
+            with self._ui_frozen():
+                self._clear_readings()
+                self._clear_axes()
+                self._reset_indicators()
+                self.btn_start.setEnabled(True)
+                self.btn_stop.setEnabled(False)
+                self.btn_fast.setEnabled(True)
+                _set_if_changed(self.info_label, f"Fuente de datos: {path.name}")
             self.settings.set("last_file", str(path))
             self.statusBar().showMessage("Fichero cargado correctamente.", 3000)
         except Exception as e:
@@ -304,161 +654,259 @@ class MainWindow(QMainWindow):
                 self, "Información", "Primero carga un fichero de datos."
             )
             return
-        self.timer.start()
+        if self._worker is not None:
+            return
+
+        self._worker = AcquisitionWorker(self.data_source, self._interval_ms)
+        self._worker_thread = QThread(self)
+        self._worker.moveToThread(self._worker_thread)
+        self._worker_thread.started.connect(self._worker.run)
+        self._worker.reading_ready.connect(self._on_reading)
+        self._worker.finished.connect(self._on_stream_end)
+        self._worker.failed.connect(self._on_stream_error)
+        self._worker_thread.start()
+        self.draw_timer.start()
         self.btn_start.setEnabled(False)
         self.btn_stop.setEnabled(True)
         self.statusBar().showMessage("Lectura iniciada.", 2000)
 
     def stop_stream(self) -> None:
-        self.timer.stop()
+        worker, thread = self._worker, self._worker_thread
+        if worker is not None:
+            self._worker = None
+            self._worker_thread = None
+            worker.stop()
+            thread.quit()
+            thread.wait()
+            # Procesar ya las lecturas que el hilo dejó en cola, para que
+            # ninguna llegue tarde (tras un reset o con otra fuente)
+            QCoreApplication.sendPostedEvents(self, QEvent.MetaCall)
+            worker.deleteLater()
+            thread.deleteLater()
+        self._flush_db_buffer()
+        self.draw_timer.stop()
+        self._refresh_view()
         self.btn_start.setEnabled(True)
         self.btn_stop.setEnabled(False)
         self.statusBar().showMessage("Lectura detenida.", 2000)
+        self._report_db_error()
 
-    def _change_interval(self, value: int) -> None:
-        self.timer.setInterval(value)
-        self.statusBar().showMessage(f"Intervalo de actualización: {value} ms", 2000)
-
-    def _update_data(self) -> None:
+    def fast_replay(self) -> None:
+        """Vuelca el resto del fichero a la BD sin pasar por el timer."""
         if not self.data_source:
             return
+        self.stop_stream()
 
-        reading = self.data_source.next_reading()
-        if reading is None:
-            self.stop_stream()
-            self.statusBar().showMessage("Fin de datos.", 4000)
+        try:
+            count = self.data_source.bulk_insert(self.db)
+        except Exception as e:
+            QMessageBox.critical(
+                self, "Error", f"No se pudo volcar el fichero:\n{e}"
+            )
             return
 
-        self.readings.append(reading)
-        self.db.insert_reading(reading)
+        # Las gráficas muestran la última ventana de lo volcado
+        if count:
+            window = self.db.get_last_n_readings(min(count, self.stats_window))
+            for reading in window:
+                self._append_reading(reading)
+            self._update_alerts(window[-1])
+            self._refresh_view()
+
+        self.statusBar().showMessage(f"Volcado rápido: {count} lecturas.", 4000)
+        self._report_db_error()
+
+    def _change_interval(self, value: int) -> None:
+        self._interval_ms = value
+        if self._worker is not None:
+            self._worker.interval_ms = value
+        self.statusBar().showMessage(f"Intervalo de actualización: {value} ms", 2000)
+
+    def _on_reading(self, reading: SensorReading) -> None:
+        """Lectura recibida del hilo de adquisición: BD, estadísticas y alertas."""
+        if not self._db_buffer:
+            self._db_buffer_since = time.monotonic()
+        self._db_buffer.append(reading)
+        if len(self._db_buffer) >= self._db_flush_threshold:
+            self._flush_db_buffer()
+        self._append_reading(reading)
+        self._update_alerts(reading)
+
+    def _flush_db_buffer(self) -> None:
+        if self._db_buffer:
+            self.db.insert_readings_many(self._db_buffer)
+            self._db_buffer = []
+
+    def _report_db_error(self) -> None:
+        """Muestra en la barra de estado el último fallo del escritor de la BD."""
+        error = self.db.take_writer_error()
+        if error is not None:
+            self.statusBar().showMessage(f"No se guardó en la BD: {error}", 10000)
+
+    def _on_stream_end(self) -> None:
+        self.stop_stream()
+        self.statusBar().showMessage("Fin de datos.", 4000)
+
+    def _on_stream_error(self, message: str) -> None:
+        self.stop_stream()
+        self.statusBar().showMessage("Lectura interrumpida por un error.", 4000)
+        QMessageBox.critical(
+            self, "Error", f"No se pudo seguir leyendo el fichero:\n{message}"
+        )
+
+    def closeEvent(self, event) -> None:
+        self.stop_stream()
+        super().closeEvent(event)
+
+    def _refresh_view(self) -> None:
+        # Con intervalos lentos el búfer tardaría minutos en llegar al umbral
+        if (
+            self._db_buffer
+            and time.monotonic() - self._db_buffer_since >= self._db_flush_age_s
+        ):
+            self._flush_db_buffer()
+        if not self._dirty:
+            return
+        self._dirty = False
 
         self._update_indicators_and_stats()
-        self._update_alerts()
         self._update_plots()
 
-        self.info_label.setText(
-            f"Última lectura: T={reading.temperature:.1f}°C  "
-            f"H={reading.humidity:.1f}%  "
-            f"L={reading.luminosity:.1f} lux"
+        t, h, l = self._ring.last()
+        _set_if_changed(
+            self.info_label,
+            f"Última lectura: T={t:.1f}°C  H={h:.1f}%  L={l:.1f} lux",
         )
 
+    def _append_reading(self, reading: SensorReading) -> None:
+        self._dirty = True
+        evicted = self._ring.append(reading)
+        if evicted is None:
+            self._temp_stats.push(reading.temperature)
+            self._hum_stats.push(reading.humidity)
+            self._lux_stats.push(reading.luminosity)
+        else:
+            t_old, h_old, l_old = evicted
+            self._temp_stats.push(reading.temperature, t_old)
+            self._hum_stats.push(reading.humidity, h_old)
+            self._lux_stats.push(reading.luminosity, l_old)
+
+    def _clear_readings(self) -> None:
+        self._dirty = False
+        self._ring.clear()
+        self._temp_stats.clear()
+        self._hum_stats.clear()
+        self._lux_stats.clear()
+
     # ===================== INDICADORES + STATS =====================
     def _reset_indicators(self) -> None:
         self.temp_gauge.setValue(0)
         self.hum_gauge.setValue(0)
         self.lux_gauge.setValue(0)
 
-        self.lbl_temp_stats.setText("μ: —   min: —   max: —")
-        self.lbl_hum_stats.setText("μ: —   min: —   max: —")
-        self.lbl_lux_stats.setText("μ: —   min: —   max: —")
+        _set_if_changed(self.lbl_temp_stats, "μ: —   min: —   max: —")
+        _set_if_changed(self.lbl_hum_stats, "μ: —   min: —   max: —")
+        _set_if_changed(self.lbl_lux_stats, "μ: —   min: —   max: —")
 
-        self.alert_label.setText("Estado del sistema: NORMAL")
+        _set_if_changed(self.alert_label, _ALERT_NORMAL_TEXT)
         self._set_alert_style("normal")
+        self._last_alert_level = "normal"
 
     def _update_indicators_and_stats(self) -> None:
-        if not self.readings:
+        if not self._ring:
             return
 
-        window = self.readings[-self.stats_window :]
-
-        temps = [r.temperature for r in window]
-        hums = [r.humidity for r in window]
-        luxs = [r.luminosity for r in window]
-
         # Últimos valores
-        t_last = temps[-1]
-        h_last = hums[-1]
-        l_last = luxs[-1]
-
-        # Actualizar gauges
-        self.temp_gauge.setValue(int(t_last))
-        self.hum_gauge.setValue(int(h_last))
-        self.lux_gauge.setValue(int(l_last))
-
-        # Stats
-        t_mean = stats.fmean(temps)
-        t_min = min(temps)
-        t_max = max(temps)
-        self.lbl_temp_stats.setText(
-            f"μ: {t_mean:.1f}   min: {t_min:.1f}   max: {t_max:.1f}"
+        t_last, h_last, l_last = self._ring.last()
+
+        # Actualizar gauges y su color (SCADA style). Un valor no finito
+        # deja el gauge como estaba: int(nan) lanzaría ValueError.
+        if math.isfinite(t_last):
+            self.temp_gauge.setValue(int(t_last))
+            self._color_gauge_temp(t_last)
+        if math.isfinite(h_last):
+            self.hum_gauge.setValue(int(h_last))
+            self._color_gauge_hum(h_last)
+        if math.isfinite(l_last):
+            self.lux_gauge.setValue(int(l_last))
+            self._color_gauge_lux(l_last)
+
+        # Stats (O(1): ya se actualizaron al añadir la lectura)
+        ts = self._temp_stats
+        _set_if_changed(
+            self.lbl_temp_stats,
+            f"μ: {ts.mean:.1f}   min: {ts.min:.1f}   max: {ts.max:.1f}"
         )
 
-        h_mean = stats.fmean(hums)
-        h_min = min(hums)
-        h_max = max(hums)
-        self.lbl_hum_stats.setText(
-            f"μ: {h_mean:.1f}   min: {h_min:.1f}   max: {h_max:.1f}"
+        hs = self._hum_stats
+        _set_if_changed(
+            self.lbl_hum_stats,
+            f"μ: {hs.mean:.1f}   min: {hs.min:.1f}   max: {hs.max:.1f}"
         )
 
-        l_mean = stats.fmean(luxs)
-        l_min = min(luxs)
-        l_max = max(luxs)
-        self.lbl_lux_stats.setText(
-            f"μ: {l_mean:.0f}   min: {l_min:.0f}   max: {l_max:.0f}"
+        ls = self._lux_stats
+        _set_if_changed(
+            self.lbl_lux_stats,
+            f"μ: {ls.mean:.0f}   min: {ls.min:.0f}   max: {ls.max:.0f}"
         )
 
-        # Colorear gauges según valor (SCADA style)
-        self._color_gauge_temp(t_last)
-        self._color_gauge_hum(h_last)
-        self._color_gauge_lux(l_last)
-
     # ====== COLOR DE GAUGES (SCADA/HMI) ======
+    # El color sale de la hoja de estilo de la ventana (_GAUGE_STATE_STYLE);
+    # solo se re-aplica el estilo del gauge si cambia su banda.
     def _color_gauge_temp(self, value: float) -> None:
         if value >= self.ALERT_TEMP_CRITICAL:
-            # Rojo
-            self.temp_gauge.setStyleSheet(
-                "QProgressBar::chunk { background-color: #ff3b30; }"
-            )
+            band = "crit"
         elif value >= self.ALERT_TEMP_HIGH:
-            # Ámbar
-            self.temp_gauge.setStyleSheet(
-                "QProgressBar::chunk { background-color: #ffcc00; }"
-            )
+            band = "warn"
         else:
-            # Verde
-            self.temp_gauge.setStyleSheet(
-                "QProgressBar::chunk { background-color: #34c759; }"
-            )
+            band = "ok"
+        if band == self._temp_band:
+            return
+        self._temp_band = band
+        _set_gauge_state(self.temp_gauge, band)
 
     def _color_gauge_hum(self, value: float) -> None:
         if value <= self.ALERT_HUM_CRITICAL:
-            self.hum_gauge.setStyleSheet(
-                "QProgressBar::chunk { background-color: #ff3b30; }"
-            )
+            band = "crit"
         elif value <= self.ALERT_HUM_LOW:
-            self.hum_gauge.setStyleSheet(
-                "QProgressBar::chunk { background-color: #ffcc00; }"
-            )
+            band = "warn"
         else:
-            self.hum_gauge.setStyleSheet(
-                "QProgressBar::chunk { background-color: #34c759; }"
-            )
+            band = "ok"
+        if band == self._hum_band:
+            return
+        self._hum_band = band
+        _set_gauge_state(self.hum_gauge, band)
 
     def _color_gauge_lux(self, value: float) -> None:
         if value >= self.ALERT_LUX_CRITICAL:
-            self.lux_gauge.setStyleSheet(
-                "QProgressBar::chunk { background-color: #ff3b30; }"
-            )
+            band = "crit"
         elif value >= self.ALERT_LUX_HIGH:
-            self.lux_gauge.setStyleSheet(
-                "QProgressBar::chunk { background-color: #ffcc00; }"
-            )
+            band = "warn"
         else:
-            self.lux_gauge.setStyleSheet(
-                "QProgressBar::chunk { background-color: #34c759; }"
-            )
-    # ===================== ALERTAS INTELIGENTES =====================
-    def _update_alerts(self) -> None:
-        if not self.readings:
+            band = "ok"
+        if band == self._lux_band:
             return
+        self._lux_band = band
+        _set_gauge_state(self.lux_gauge, band)
 
-        last = self.readings[-1]
+    # ===================== ALERTAS INTELIGENTES =====================
+    def _update_alerts(self, last: SensorReading) -> None:
         t = last.temperature
         h = last.humidity
         l = last.luminosity
 
+        # Caso habitual: ningún canal llega al umbral de aviso
+        hi_t, hi_h, hi_l = self._alert_hi
+        if not (t >= hi_t or -h >= hi_h or l >= hi_l):
+            if self._last_alert_level != "normal":
+                self._last_alert_level = "normal"
+                _set_if_changed(self.alert_label, _ALERT_NORMAL_TEXT)
+                self._set_alert_style("normal")
+                # Si quieres guardar también la vuelta a normal, descomenta:
+                # self.db.insert_alert(level="normal", message="Estado normal", reading=last)
+            return
+
         critical = False
-        warning = False
         messages: List[str] = []
 
         # Temperatura
@@ -466,7 +914,6 @@ class MainWindow(QMainWindow):
             critical = True
             messages.append(f"T alta CRÍTICA ({t:.1f} °C)")
         elif t >= self.ALERT_TEMP_HIGH:
-            warning = True
             messages.append(f"T alta ({t:.1f} °C)")
 
         # Humedad
@@ -474,7 +921,6 @@ class MainWindow(QMainWindow):
             critical = True
             messages.append(f"H baja CRÍTICA ({h:.1f} %)")
         elif h <= self.ALERT_HUM_LOW:
-            warning = True
             messages.append(f"H baja ({h:.1f} %)")
 
         # Lux
@@ -482,113 +928,135 @@ class MainWindow(QMainWindow):
             critical = True
             messages.append(f"Luz ALTA CRÍTICA ({l:.0f} lux)")
         elif l >= self.ALERT_LUX_HIGH:
-            warning = True
             messages.append(f"Luz alta ({l:.0f} lux)")
 
-        # Texto y nivel final
-        if critical:
-            level = "critical"
-            full_msg = " | ".join(messages)
-            self.alert_label.setText("⚠ ALERTA CRÍTICA: " + full_msg)
-            self._set_alert_style("critical")
-            self.statusBar().showMessage("ALERTA CRÍTICA: " + full_msg, 5000)
-
-            # 👉 Guardar alerta en la base de datos
-            self.db.insert_alert(level=level, message=full_msg, reading=last)
-
-        elif warning:
-            level = "warning"
-            full_msg = " | ".join(messages)
-            self.alert_label.setText("⚠ ALERTA: " + full_msg)
-            self._set_alert_style("warning")
-            self.statusBar().showMessage("Alerta: " + full_msg, 5000)
+        # Texto y nivel final (aquí siempre hay al menos un aviso)
+        level = "critical" if critical else "warning"
+        full_msg = " | ".join(messages)
+        _set_if_changed(self.alert_label, _ALERT_PREFIX[level] + full_msg)
+        if level == self._last_alert_level:
+            return
+        self._last_alert_level = level
+        self._set_alert_style(level)
+        self.statusBar().showMessage(_STATUS_PREFIX[level] + full_msg, 5000)
 
-            # 👉 Guardar alerta en la base de datos
-            self.db.insert_alert(level=level, message=full_msg, reading=last)
+        # 👉 Guardar alerta en la base de datos (solo al cambiar de nivel)
+        self.db.insert_alert(level=level, message=full_msg, reading=last)
 
-        else:
-            level = "normal"
-            self.alert_label.setText("Estado del sistema: NORMAL")
-            self._set_alert_style("normal")
-            # Si quieres guardar también los estados normales, descomenta:
-            # self.db.insert_alert(level=level, message="Estado normal", reading=last)
-    
     def _set_alert_style(self, level: str) -> None:
         """Cambia los colores del panel de alerta según el nivel."""
-        if level == "critical":
-            # Rojo
-            self.alert_label.setStyleSheet(
-                "background-color: #ff3b30; color: white; font-weight: 700; padding: 4px; border-radius: 4px;"
-            )
-        elif level == "warning":
-            # Ámbar
-            self.alert_label.setStyleSheet(
-                "background-color: #ffcc00; color: black; font-weight: 700; padding: 4px; border-radius: 4px;"
-            )
-        else:
-            # Verde (normal)
-            self.alert_label.setStyleSheet(
-                "background-color: #34c759; color: black; font-weight: 700; padding: 4px; border-radius: 4px;"
-            )
+        self.alert_label.setStyleSheet(_ALERT_STYLES.get(level, _STYLE_NORMAL))
 
     # ===================== GRÁFICAS =====================
     def _clear_axes(self) -> None:
-        self.ax_temp.clear()
-        self.ax_hum.clear()
-        self.ax_lux.clear()
+        for line in self._plot_lines:
+            line.set_data([], [])
+        self._plot_needs_rescale = True
         self.canvas.draw()
 
+    def _on_canvas_draw(self, event) -> None:
+        # Tras un draw() completo (también al redimensionar): guardar el fondo
+        # de cada eje y pintar encima las líneas animadas.
+        self._plot_backgrounds = [
+            self.canvas.copy_from_bbox(ax.bbox) for ax in self._plot_axes
+        ]
+        for ax, line in zip(self._plot_axes, self._plot_lines):
+            ax.draw_artist(line)
+
     def _update_plots(self) -> None:
-        if not self.readings:
+        if not self._ring:
             return
 
-        data = self.readings[-self.stats_window :]
-
-        times = [r.timestamp for r in data]
-        temps = [r.temperature for r in data]
-        hums = [r.humidity for r in data]
-        luxs = [r.luminosity for r in data]
-
-        self.ax_temp.clear()
-        self.ax_hum.clear()
-        self.ax_lux.clear()
-
-        self.ax_temp.plot(times, temps)
-        self.ax_temp.set_ylabel("Temp (°C)")
-        self.ax_temp.grid(True)
-
-        self.ax_hum.plot(times, hums)
-        self.ax_hum.set_ylabel("Humedad (%)")
-        self.ax_hum.grid(True)
-
-        self.ax_lux.plot(times, luxs)
-        self.ax_lux.set_ylabel("Lux")
-        self.ax_lux.set_xlabel("Tiempo")
-        self.ax_lux.grid(True)
+        # Vistas contiguas del buffer: sin listas ni bucles Python por tick
+        times, temps, hums, luxs = self._ring.columns()
+        if len(times) > 2 * _PLOT_POINTS:
+            # Ventanas largas: misma forma con muchos menos segmentos
+            self._line_temp.set_data(*_downsample(times, temps))
+            self._line_hum.set_data(*_downsample(times, hums))
+            self._line_lux.set_data(*_downsample(times, luxs))
+        else:
+            self._line_temp.set_data(times, temps)
+            self._line_hum.set_data(times, hums)
+            self._line_lux.set_data(times, luxs)
+
+        if self._plot_limits_stale(times):
+            # Los límites cambian: redibujado completo (ticks incluidos)
+            self._rescale_axes(times)
+            self.canvas.draw()
+            return
 
-        self.figure.autofmt_xdate()
-        self.canvas.draw()
+        # Blitting: restaurar el fondo y pintar solo las líneas
+        for ax, line, background in zip(
+            self._plot_axes, self._plot_lines, self._plot_backgrounds
+        ):
+            self.canvas.restore_region(background)
+            ax.draw_artist(line)
+            self.canvas.blit(ax.bbox)
+
+    def _plot_limits_stale(self, times: np.ndarray) -> bool:
+        if self._plot_needs_rescale or self._plot_backgrounds is None:
+            return True
+        x_min, x_max = self.ax_temp.get_xlim()
+        if self._date2num(times[0]) < x_min or self._date2num(times[-1]) > x_max:
+            return True
+        for ax, window in zip(
+            self._plot_axes, (self._temp_stats, self._hum_stats, self._lux_stats)
+        ):
+            y_min, y_max = ax.get_ylim()
+            if window.min < y_min or window.max > y_max:
+                return True
+        return False
+
+    def _rescale_axes(self, times: np.ndarray) -> None:
+        # Se deja margen (25% en X, 10% en Y) para que los siguientes ticks
+        # quepan sin otro redibujado completo.
+        x0 = self._date2num(times[0])
+        x1 = self._date2num(times[-1])
+        x_span = (x1 - x0) or 1 / 1440  # un minuto si solo hay un punto
+        for ax, window in zip(
+            self._plot_axes, (self._temp_stats, self._hum_stats, self._lux_stats)
+        ):
+            ax.set_xlim(x0, x1 + 0.25 * x_span)
+            y_min, y_max = window.min, window.max
+            if math.isfinite(y_min) and math.isfinite(y_max):
+                pad = 0.1 * ((y_max - y_min) or abs(y_max) or 1.0)
+                ax.set_ylim(y_min - pad, y_max + pad)
+        self._plot_needs_rescale = False
 
     def _reset_plots(self) -> None:
-        self.readings.clear()
-        self._clear_axes()
-        self._reset_indicators()
-        self.info_label.setText("Gráficas reseteadas. Vuelve a iniciar la lectura.")
+        with self._ui_frozen():
+            self._clear_readings()
+            self._clear_axes()
+            self._reset_indicators()
+            _set_if_changed(
+                self.info_label, "Gráficas reseteadas. Vuelve a iniciar la lectura."
+            )
         self.statusBar().showMessage("Gráficas reseteadas.", 2000)
 
     # ===================== EXPORTAR A EXCEL =====================
     def export_excel(self) -> None:
         output_str, _ = QFileDialog.getSaveFileName(
             self,
-            "Exportar histórico a Excel",
+            "Exportar histórico",
             "sensor_data.xlsx",
-            "Excel (*.xlsx)",
+            "Excel (*.xlsx);;CSV (*.csv);;Parquet (*.parquet)",
         )
         if not output_str:
             return
 
+        output = Path(output_str)
+        suffix = output.suffix.lower()
+        if suffix == ".csv":
+            exporter = export_to_csv
+        elif suffix == ".parquet":
+            exporter = export_to_parquet
+        else:
+            exporter = export_to_excel
+
         try:
-            export_to_excel(self.db, Path(output_str))
+            self._flush_db_buffer()
+            exporter(self.db, output)
+            self._report_db_error()
             QMessageBox.information(
                 self,
                 "Exportación",
@@ -596,10 +1064,20 @@ class MainWindow(QMainWindow):
             )
         except Exception as e:
             QMessageBox.critical(
-                self, "Error", f"No se pudo exportar a Excel:\n{e}"
+                self, "Error", f"No se pudo exportar:\n{e}"
             )
 
     # ===================== MODO OSCURO / CLARO =====================
+    @contextmanager
+    def _ui_frozen(self) -> Iterator[None]:
+        """Agrupa varios cambios de widgets/estilo en un solo repintado."""
+        self.setUpdatesEnabled(False)
+        try:
+            yield
+        finally:
+            self.setUpdatesEnabled(True)
+            self.update()
+
     def toggle_dark_mode(self, state: int) -> None:
         enabled = state == Qt.Checked
         self.settings.set("dark_mode", enabled)
@@ -652,7 +1130,8 @@ class MainWindow(QMainWindow):
             background-color: transparent;
         }
         """
-        self.setStyleSheet(dark_style)
+        with self._ui_frozen():
+            self.setStyleSheet(dark_style + _GAUGE_STATE_STYLE)
 
     def _apply_light_palette(self) -> None:
         light_style = """
@@ -698,4 +1177,5 @@ class MainWindow(QMainWindow):
             background-color: transparent;
         }
         """
-        self.setStyleSheet(light_style)
+        with self._ui_frozen():
+            self.setStyleSheet(light_style + _GAUGE_STATE_STYLE)